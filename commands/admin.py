@@ -0,0 +1,334 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import io
+import time
+from datetime import datetime
+from typing import Optional
+from config import Config
+from utils.tracing import tracer
+from utils.profiler import run_sampling_profile, command_profiler
+from utils.roblox_api import roblox_client
+from utils.circuit_breaker import CircuitOpenError, roblox_breaker
+from utils.ranks import resolve_group_ranks, format_nickname, rank_tables
+from utils.storage import load_json, update_json
+from utils.shutdown import shutdown
+
+def is_admin(interaction: discord.Interaction) -> bool:
+    """Check if the interaction user is a server administrator"""
+    return isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.administrator
+
+class AdminCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.bulk_runs = set()  # Guild IDs with a bulk reverify in progress
+
+    @app_commands.command(name="slow_traces", description="Show the slowest recent interaction traces (Admin only)")
+    @app_commands.describe(
+        flow="Only show traces for this flow",
+        limit="How many traces to show (1-10)"
+    )
+    @app_commands.choices(flow=[
+        app_commands.Choice(name="Verify button", value="verify_button"),
+        app_commands.Choice(name="Open ticket", value="ticket_open"),
+        app_commands.Choice(name="Close ticket", value="ticket_close")
+    ])
+    async def slow_traces(self, interaction: discord.Interaction, flow: Optional[app_commands.Choice[str]] = None, limit: int = 5):
+        """Show the slowest traces in the in-memory ring buffer"""
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        limit = max(1, min(limit, 10))
+        traces = tracer.slowest(limit, name=flow.value if flow else None)
+
+        embed = discord.Embed(
+            title="🐢 Slowest Recent Traces",
+            color=Config.COLORS['info'],
+            timestamp=datetime.utcnow()
+        )
+
+        if not traces:
+            embed.description = "No traces recorded yet."
+
+        for trace in traces:
+            data = trace.to_dict()
+            # Show the slowest spans of each trace, indented by nesting depth
+            depth = {}
+            for span in data["spans"]:
+                depth[span["id"]] = depth[span["parent"]] + 1 if span["parent"] is not None else 0
+            top_spans = sorted(data["spans"], key=lambda s: s["duration_ms"] or 0, reverse=True)[:6]
+            top_spans.sort(key=lambda s: s["start_ms"])
+            lines = [
+                f"{'  ' * depth[s['id']]}`{s['duration_ms'] or 0:>8.1f}ms` {s['name']}"
+                + (f" ({s['attributes']['file']})" if 'file' in s['attributes'] else "")
+                + (" ⚠️" if s.get('error') else "")
+                for s in top_spans
+            ]
+            value = "\n".join(lines) or "No spans recorded"
+            embed.add_field(
+                name=f"{data['name']} • {data['duration_ms']:.0f}ms"[:256],
+                value=f"<t:{int(data['started_at'])}:R> • ID `{data['trace_id']}`{' • error: ' + data['error'] if data['error'] else ''}\n{value}"[:1024],
+                inline=False
+            )
+
+        embed.set_footer(text=f"{len(tracer.traces)} traces in buffer")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="profile", description="Profile the bot process for a number of seconds (Admin only)")
+    @app_commands.describe(
+        mode="Sampling (whole process, flamegraph-ready) or cProfile scoped to one command",
+        seconds="How long to sample, or how long to wait for the command to run (1-120)",
+        command="Command to profile in cProfile mode (e.g. schedule, update_member_count)"
+    )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Sampling (collapsed stacks)", value="sampling"),
+        app_commands.Choice(name="cProfile (single command)", value="cprofile")
+    ])
+    async def profile(self, interaction: discord.Interaction, mode: app_commands.Choice[str], seconds: int = 10, command: Optional[str] = None):
+        """Run an on-demand profiler and attach the result"""
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        seconds = max(1, min(seconds, Config.PROFILE_MAX_SECONDS))
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        if mode.value == "sampling":
+            collapsed, samples = await run_sampling_profile(seconds, interval=Config.PROFILE_SAMPLE_INTERVAL)
+            file = discord.File(io.BytesIO(collapsed.encode()), filename=f"profile-{int(datetime.utcnow().timestamp())}.collapsed")
+            await interaction.followup.send(
+                f"🔥 Sampled the event loop for {seconds}s ({samples:,} samples). "
+                "Open the file with speedscope or `flamegraph.pl` to view the flamegraph.",
+                file=file,
+                ephemeral=True
+            )
+            return
+
+        if not command:
+            await interaction.followup.send("❌ cProfile mode needs a command name to profile.", ephemeral=True)
+            return
+
+        command = command.lstrip("/").strip()
+        try:
+            result = command_profiler.arm(command)
+        except RuntimeError as e:
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+            return
+
+        try:
+            report, raw = await asyncio.wait_for(asyncio.shield(result), timeout=seconds)
+        except asyncio.TimeoutError:
+            command_profiler.disarm()
+            await interaction.followup.send(
+                f"⌛ `{command}` didn't run within {seconds}s, profiler disarmed.",
+                ephemeral=True
+            )
+            return
+        except asyncio.CancelledError:
+            await interaction.followup.send("❌ Profiling was cancelled.", ephemeral=True)
+            return
+
+        files = [
+            discord.File(io.BytesIO(report.encode()), filename=f"cprofile-{command}.txt"),
+            discord.File(io.BytesIO(raw), filename=f"cprofile-{command}.prof")
+        ]
+        await interaction.followup.send(
+            f"📊 cProfile report for one run of `{command}` (the `.prof` file works with snakeviz/pstats).",
+            files=files,
+            ephemeral=True
+        )
+
+    @app_commands.command(name="reload_rank_tables", description="Reload the rank tables file now (Admin only)")
+    async def reload_rank_tables(self, interaction: discord.Interaction):
+        """Pick up rank table edits without waiting for the next periodic check"""
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        await asyncio.to_thread(rank_tables.reload_if_changed, True)
+        await interaction.response.send_message(
+            f"✅ {len(rank_tables.tables)} rank table(s) loaded. Invalid files are logged and the previous tables kept.",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="bulk_reverify", description="Refresh ranks, nicknames and roles of verified members (Admin only)")
+    @app_commands.describe(role="Only refresh members with this role (default: every verified member)")
+    async def bulk_reverify(self, interaction: discord.Interaction, role: Optional[discord.Role] = None):
+        """Re-rank verified members from Roblox and apply nickname/role changes"""
+        if not is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+        if interaction.guild.id in self.bulk_runs:
+            await interaction.response.send_message("❌ A bulk reverify is already running in this server.", ephemeral=True)
+            return
+
+        # Progress goes to a channel message, which (unlike the interaction) doesn't expire after 15 minutes
+        await interaction.response.send_message("🔄 Bulk reverify started, progress is posted below.", ephemeral=True)
+        message = await interaction.channel.send(embed=discord.Embed(
+            title="🔄 Bulk Reverify",
+            description="Loading verified members...",
+            color=Config.COLORS['info']
+        ))
+
+        self.bulk_runs.add(interaction.guild.id)
+        try:
+            await self.run_bulk_reverify(interaction.guild, role, message)
+        finally:
+            self.bulk_runs.discard(interaction.guild.id)
+
+    async def run_bulk_reverify(self, guild: discord.Guild, role: Optional[discord.Role], message: discord.Message):
+        """Process verified users in chunks: resolve members, fetch ranks, queue role syncs, store ranks
+
+        Only the list of verified IDs and two chunks of work are held at once,
+        so memory stays flat for very large rosters.
+        """
+        user_data = await asyncio.to_thread(load_json, Config.USER_DATA_FILE)
+        verified = [
+            (int(user_id), data["verification"]["roblox_user_id"], data["verification"].get("roblox_username", ""))
+            for user_id, data in user_data.items()
+            if data.get("verification", {}).get("verified") and data["verification"].get("roblox_user_id")
+        ]
+        del user_data
+
+        stats = {"processed": 0, "changed": 0, "failed": 0, "skipped": 0}
+        started = time.monotonic()
+        last_update = 0.0
+        group_ids = [Config.ROBLOX_GROUP_ID] + Config.ROBLOX_SUBGROUP_IDS
+        limiter = asyncio.Semaphore(Config.BULK_ROBLOX_CONCURRENCY)
+
+        def render(state: str) -> discord.Embed:
+            elapsed = time.monotonic() - started
+            remaining = len(verified) - stats["processed"]
+            eta = elapsed / stats["processed"] * remaining if stats["processed"] else None
+            embed = discord.Embed(
+                title=f"🔄 Bulk Reverify - {state}",
+                description=f"Scope: {role.mention if role else 'all verified members'}",
+                color=Config.COLORS['success'] if state == "Done" else Config.COLORS['info'],
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="Processed", value=f"{stats['processed']:,}/{len(verified):,}", inline=True)
+            embed.add_field(name="Changed", value=f"{stats['changed']:,}", inline=True)
+            embed.add_field(name="Failed", value=f"{stats['failed']:,}", inline=True)
+            embed.add_field(name="Skipped", value=f"{stats['skipped']:,} (not in server or scope)", inline=True)
+            embed.add_field(name="Elapsed", value=f"{int(elapsed)}s", inline=True)
+            embed.add_field(name="ETA", value=f"{int(eta)}s" if eta is not None and remaining else "-", inline=True)
+            return embed
+
+        async def fetch_ranks(api, roblox_id):
+            async with limiter:
+                return await api.get_user_group_ranks(roblox_id, group_ids)
+
+        async def collect(futures):
+            """Wait for a chunk's role syncs and count the outcomes"""
+            for result in await asyncio.gather(*futures, return_exceptions=True):
+                if isinstance(result, Exception):
+                    stats["failed"] += 1
+                elif not result.empty:
+                    stats["changed"] += 1
+
+        pending = []
+        state = "Done"
+        for start in range(0, len(verified), Config.BULK_REVERIFY_CHUNK):
+            if shutdown.draining:
+                state = "Interrupted (bot restarting)"
+                break
+            chunk = verified[start:start + Config.BULK_REVERIFY_CHUNK]
+
+            # Resolve which users are in this guild (and in scope) with one gateway request
+            try:
+                members = await guild.query_members(user_ids=[user_id for user_id, _, _ in chunk], limit=len(chunk), cache=False)
+            except asyncio.TimeoutError:
+                stats["failed"] += len(chunk)
+                stats["processed"] += len(chunk)
+                continue
+            by_id = {member.id: member for member in members}
+            jobs = []
+            for user_id, roblox_id, username in chunk:
+                member = by_id.get(user_id)
+                if member is None or (role is not None and role not in member.roles):
+                    stats["skipped"] += 1
+                else:
+                    jobs.append((member, roblox_id, username))
+
+            # Pause during a Roblox outage, retrying the lookups the circuit breaker refused
+            results = [None] * len(jobs)
+            todo = list(range(len(jobs)))
+            while todo:
+                if not await roblox_breaker.wait_until_available(Config.ROBLOX_RECOVERY_WAIT):
+                    break
+                try:
+                    async with roblox_client(Config.ROBLOX_COOKIE) as api:
+                        fetched = await asyncio.gather(*(fetch_ranks(api, jobs[i][1]) for i in todo), return_exceptions=True)
+                except Exception as e:
+                    print(f"Error fetching ranks for bulk reverify: {e}")
+                    fetched = [e] * len(todo)
+                for i, result in zip(todo, fetched):
+                    results[i] = result
+                # Timeouts and other errors count as failed members, refusals are retried
+                todo = [i for i in todo if isinstance(results[i], CircuitOpenError)]
+            if todo:
+                state = "Stopped (Roblox unavailable)"
+                break
+
+            futures = []
+            updates = {}
+            for (member, roblox_id, username), groups in zip(jobs, results):
+                if isinstance(groups, Exception) or not groups or Config.ROBLOX_GROUP_ID not in groups:
+                    stats["failed"] += 1  # Lookup failed or no longer in the main group
+                    continue
+                nickname_group_id, group_ranks = resolve_group_ranks(groups, guild.id)
+                rank = group_ranks[nickname_group_id]
+                futures.append(self.bot.role_sync.submit(member, rank, format_nickname(rank, username)))
+                updates[str(member.id)] = {
+                    "rank": rank.code,
+                    "rank_name": groups[nickname_group_id]["rank_name"],
+                    "rank_id": groups[nickname_group_id]["rank_id"],
+                    "nickname_group_id": nickname_group_id,
+                    "groups": {
+                        str(group_id): {"rank_id": info["rank_id"], "rank_name": info["rank_name"], "rank": group_ranks[group_id].code}
+                        for group_id, info in groups.items()
+                    }
+                }
+
+            def store_ranks(user_data):
+                for user_id, fields in updates.items():
+                    if "verification" in user_data.get(user_id, {}):
+                        user_data[user_id]["verification"].update(fields)
+
+            if updates:
+                await asyncio.to_thread(update_json, Config.USER_DATA_FILE, store_ranks)
+
+            # Let this chunk's edits queue up while the previous chunk's finish
+            await collect(pending)
+            pending = futures
+            stats["processed"] += len(chunk)
+
+            if time.monotonic() - last_update >= Config.BULK_PROGRESS_INTERVAL:
+                last_update = time.monotonic()
+                try:
+                    await message.edit(embed=render("Running"))
+                except discord.HTTPException:
+                    pass
+
+        await collect(pending)
+        try:
+            await message.edit(embed=render(state))
+        except discord.HTTPException:
+            pass
+
+async def setup(bot):
+    await bot.add_cog(AdminCommands(bot))
@@ -1,17 +1,263 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import json
 import os
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional
 from config import Config
-from utils.ranks import get_nato_rank
-from utils.roblox_api import RobloxAPI
+from utils.roblox_api import roblox_client
+from utils.storage import load_json, save_json, update_json
+from utils.event_time import parse_event_time, format_event_time
+from utils.scheduler import TimerHeap
+from utils.pad_index import PadIndex, Booking
+from utils.event_index import EventIndex
+from utils.prefix_trie import PrefixTrie
+from utils.shutdown import shutdown
+from utils.metrics import QUEUE_DEPTH
+
+EVENT_LABELS = {"tryouts": "tryout", "trainings": "training"}
+EVENTS_PAGE_SIZE = 10
+CANONICAL_TYPE_WEIGHT = 3  # Canonical types rank above values used only once or twice
+DEFAULT_AVATAR_URL = "https://cdn.jsdelivr.net/gh/feathericons/feather/icons/user.svg"
+
+class EventsPageView(discord.ui.View):
+    """Previous/next buttons for the /events board, reading one page from the index per click"""
+    
+    def __init__(self, cog, guild: discord.Guild, user_id: int, after: float):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.guild = guild
+        self.user_id = user_id
+        self.after = after  # Fixed when the board was opened so pages don't shift
+        self.page = 0
+        self.update_buttons()
+    
+    @property
+    def page_count(self) -> int:
+        total = self.cog.event_index.count_after(self.guild.id, self.after)
+        return max(1, (total + EVENTS_PAGE_SIZE - 1) // EVENTS_PAGE_SIZE)
+    
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+    
+    def build_embed(self) -> discord.Embed:
+        entries = self.cog.event_index.page(self.guild.id, self.after, self.page * EVENTS_PAGE_SIZE, EVENTS_PAGE_SIZE)
+        embed = discord.Embed(
+            title=f"📅 Upcoming Events in {self.guild.name}",
+            color=Config.COLORS['military'],
+            timestamp=datetime.utcnow()
+        )
+        if entries:
+            embed.description = "\n".join(
+                f"<t:{int(start)}:f> (<t:{int(start)}:R>) - **{event['type']}** {event['label']} "
+                f"· Pad {event['pad']} · <@{event['host_id']}>"
+                for start, event in entries
+            )
+        else:
+            embed.description = "No upcoming tryouts or trainings."
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+        return embed
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ Run `/events` to browse the board yourself!", ephemeral=True)
+            return False
+        return await shutdown.admit(interaction)
+    
+    async def show_page(self, interaction: discord.Interaction, page: int):
+        self.page = max(0, min(page, self.page_count - 1))
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+    
+    @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary, emoji='◀️')
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page - 1)
+    
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary, emoji='▶️')
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page + 1)
 
 class MilitaryCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.ensure_data_file()
+        self.reminders = TimerHeap(self.send_reminder)
+        self.pad_index = PadIndex()
+        self.event_index = EventIndex()
+        self.type_tries = {}
+        self.indexes_loaded = False
+        self.index_lock = asyncio.Lock()
+        self.host_avatars = {}  # Discord user ID -> cached Roblox avatar URL
+    
+    async def cog_load(self):
+        QUEUE_DEPTH.set_function(lambda: len(self.reminders), queue="event_reminders")
+    
+    async def cog_unload(self):
+        self.reminders.stop()
+        self.refresh_avatars.cancel()
+    
+    async def warm_up(self):
+        """Schedule reminders for every upcoming event in our guilds (run after ready)"""
+        user_data = await asyncio.to_thread(self.load_user_data)
+        async with self.index_lock:
+            if not self.indexes_loaded:
+                self.rebuild_indexes(user_data)
+        for user_id, data in user_data.items():
+            avatar_url = data.get("verification", {}).get("avatar_url")
+            if avatar_url:
+                self.host_avatars[user_id] = avatar_url
+            for kind in EVENT_LABELS:
+                for event in data.get(kind, []):
+                    self.schedule_event_reminders(user_id, kind, event)
+        self.reminders.start()
+        if not self.refresh_avatars.is_running():
+            self.refresh_avatars.start()
+    
+    async def ensure_indexes(self):
+        """Build the indexes off the event loop if warm_up hasn't yet"""
+        if self.indexes_loaded:
+            return
+        async with self.index_lock:
+            if not self.indexes_loaded:
+                self.rebuild_indexes(await asyncio.to_thread(self.load_user_data))
+    
+    def rebuild_indexes(self, user_data):
+        """Index every event with a known start time by guild (and pad)"""
+        self.pad_index.clear()
+        self.event_index.clear()
+        self.type_tries.clear()
+        for user_id, data in user_data.items():
+            for kind in EVENT_LABELS:
+                for event in data.get(kind, []):
+                    self.index_event(user_id, kind, event)
+                    self.record_event_type(event.get("guild_id"), kind, event.get("type", ""))
+        self.indexes_loaded = True
+    
+    def get_type_trie(self, guild_id: int, kind: str) -> PrefixTrie:
+        """Autocomplete trie of one guild's tryout or training types"""
+        trie = self.type_tries.get((guild_id, kind))
+        if trie is None:
+            trie = PrefixTrie()
+            canonical = Config.TRYOUT_TYPES if kind == "tryouts" else Config.TRAINING_TYPES
+            for event_type in canonical:
+                trie.add(event_type, CANONICAL_TYPE_WEIGHT)
+            self.type_tries[(guild_id, kind)] = trie
+        return trie
+    
+    def record_event_type(self, guild_id, kind: str, event_type: str):
+        if guild_id and str(guild_id).isdigit():
+            self.get_type_trie(int(guild_id), kind).add(event_type)
+    
+    def canonical_type(self, guild: Optional[discord.Guild], kind: str, event_type: str) -> str:
+        """Use the known spelling of a type so stored values stay consistent"""
+        if guild is None:
+            return event_type
+        return self.get_type_trie(guild.id, kind).canonical(event_type) or event_type.strip()
+    
+    def type_choices(self, interaction: discord.Interaction, kind: str, current: str):
+        # Autocomplete has to answer within 3 seconds, so don't wait for warm_up to build the tries
+        if not interaction.guild or not self.indexes_loaded:
+            return []
+        return [
+            app_commands.Choice(name=value[:100], value=value[:100])
+            for value in self.get_type_trie(interaction.guild.id, kind).complete(current)
+        ]
+    
+    def event_booking(self, user_id: str, kind: str, event: dict) -> Optional[Booking]:
+        """Pad booking of an event, None if it has no known start or guild"""
+        guild_id = event.get("guild_id")
+        if not event.get("starts_at") or not guild_id or not guild_id.isdigit():
+            return None
+        start = datetime.fromisoformat(event["starts_at"]).timestamp()
+        end = start + event.get("duration", Config.EVENT_DEFAULT_DURATION) * 60
+        return Booking(start, end, f"{user_id}:{kind}:{event['timestamp']}", user_id)
+    
+    def index_event(self, user_id: str, kind: str, event: dict):
+        booking = self.event_booking(user_id, kind, event)
+        if booking is None:
+            return
+        guild_id = int(event["guild_id"])
+        self.pad_index.add(guild_id, event["pad"], booking)
+        self.event_index.add(guild_id, booking.start, booking.event_id, {
+            "type": event["type"],
+            "label": EVENT_LABELS[kind],
+            "pad": event["pad"],
+            "host_id": user_id
+        })
+    
+    def unindex_event(self, user_id: str, kind: str, event: dict):
+        booking = self.event_booking(user_id, kind, event)
+        if booking is None:
+            return
+        guild_id = int(event["guild_id"])
+        self.pad_index.remove(guild_id, event["pad"], booking)
+        self.event_index.remove(guild_id, booking.start, booking.event_id)
+    
+    def find_pad_conflict(self, guild: discord.Guild, pad_number: int, start_time, duration: int):
+        """The existing booking that overlaps a new one on the same pad, if any (await ensure_indexes() first)"""
+        if guild is None or start_time is None:
+            return None  # Free-text times can't be checked
+        start = start_time.timestamp()
+        return self.pad_index.conflict(guild.id, pad_number, start, start + duration * 60)
+    
+    async def send_pad_conflict(self, interaction: discord.Interaction, pad_number: int, booking: Booking):
+        await interaction.response.send_message(
+            f"❌ Pad {pad_number} is already booked by <@{booking.host_id}> "
+            f"from <t:{int(booking.start)}:t> to <t:{int(booking.end)}:t>! "
+            f"Use `/pad_availability` to find a free slot.",
+            ephemeral=True
+        )
+    
+    def schedule_event_reminders(self, user_id: str, kind: str, event: dict):
+        """Queue the reminder pings and the start announcement of one event"""
+        if not event.get("starts_at") or not event.get("channel_id"):
+            return
+        guild_id = event.get("guild_id")
+        if not guild_id or not guild_id.isdigit() or self.bot.get_guild(int(guild_id)) is None:
+            return  # Not our guild (another cluster handles it) or a DM
+        
+        start = datetime.fromisoformat(event["starts_at"]).timestamp()
+        stages = {f"reminder_{minutes}": start - minutes * 60 for minutes in Config.EVENT_REMINDER_LEAD_MINUTES}
+        stages["start"] = start
+        
+        cutoff = time.time() - Config.EVENT_REMINDER_GRACE
+        event_id = f"{user_id}:{kind}:{event['timestamp']}"
+        for stage, fire_at in stages.items():
+            if fire_at < cutoff or stage in event.get("reminded", []):
+                continue
+            payload = {"user_id": user_id, "kind": kind, "event": event, "stage": stage}
+            self.reminders.schedule((event_id, stage), fire_at, payload)
+    
+    async def send_reminder(self, key, payload):
+        """Post a reminder or start announcement and record that it was sent"""
+        event, stage, user_id = payload["event"], payload["stage"], payload["user_id"]
+        label = EVENT_LABELS[payload["kind"]]
+        start = int(datetime.fromisoformat(event["starts_at"]).timestamp())
+        
+        channel = self.bot.get_channel(int(event["channel_id"]))
+        if channel is None:
+            return
+        if stage == "start":
+            message = f"🚨 **{event['type']}** {label} on **Pad {event['pad']}** is starting now! Hosted by <@{user_id}>"
+        else:
+            message = f"⏰ <@{user_id}> your **{event['type']}** {label} on **Pad {event['pad']}** starts <t:{start}:R>"
+        try:
+            await channel.send(message)
+        except discord.HTTPException as e:
+            print(f"Error sending event reminder: {e}")
+            return
+        
+        # Remember sent stages so a restart doesn't repeat them
+        def mark_reminded(user_data):
+            for stored in user_data.get(user_id, {}).get(payload["kind"], []):
+                if stored.get("timestamp") == event["timestamp"]:
+                    stored.setdefault("reminded", []).append(stage)
+        
+        await asyncio.to_thread(self.update_user_data, mark_reminded)
     
     def ensure_data_file(self):
         """Ensure the data directory and file exist"""
@@ -22,42 +268,83 @@ class MilitaryCommands(commands.Cog):
     
     def load_user_data(self):
         """Load user data from JSON file"""
-        try:
-            with open(Config.USER_DATA_FILE, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        return load_json(Config.USER_DATA_FILE)
     
     def save_user_data(self, data):
         """Save user data to JSON file"""
-        with open(Config.USER_DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_json(Config.USER_DATA_FILE, data)
+    
+    def update_user_data(self, mutate):
+        """Apply a change to user data under the shared file lock"""
+        return update_json(Config.USER_DATA_FILE, mutate)
     
     async def get_host_avatar(self, user_id: str) -> str:
-        """Get the host's Roblox avatar URL"""
+        """Get the host's Roblox avatar URL, from memory or the URL stored at verification"""
+        avatar_url = self.host_avatars.get(user_id)
+        if avatar_url is None:
+            # Verified after warm-up (or not at all), read it off the event loop
+            user_data = await asyncio.to_thread(self.load_user_data)
+            avatar_url = user_data.get(user_id, {}).get("verification", {}).get("avatar_url")
+            if not avatar_url:
+                return DEFAULT_AVATAR_URL
+            self.host_avatars[user_id] = avatar_url
+        return avatar_url
+    
+    @tasks.loop(seconds=Config.AVATAR_REFRESH_INTERVAL)
+    async def refresh_avatars(self):
+        """Refresh expired avatar URLs of verified users in batches of 100"""
+        user_data = await asyncio.to_thread(self.load_user_data)
+        now = datetime.utcnow().isoformat()
+        stale = {}
+        for user_id, data in user_data.items():
+            verification = data.get("verification", {})
+            guild_id = verification.get("guild_id", "")
+            # Each cluster refreshes the users verified in its own guilds
+            if not verification.get("roblox_user_id") or not guild_id.isdigit() or not self.bot.get_guild(int(guild_id)):
+                continue
+            if verification.get("avatar_expires_at", "") <= now:
+                stale[verification["roblox_user_id"]] = user_id
+        if not stale:
+            return
+        
+        avatars = {}
+        roblox_ids = list(stale)
         try:
-            user_data = self.load_user_data()
-            if user_id in user_data and 'roblox_user_id' in user_data[user_id]:
-                roblox_user_id = user_data[user_id]['roblox_user_id']
-                
-                async with RobloxAPI(Config.ROBLOX_COOKIE) as api:
-                    avatar_url = await api.get_user_avatar_url(roblox_user_id)
-                    if avatar_url:
-                        return avatar_url
-            
-            # Default avatar if not found
-            return "https://cdn.jsdelivr.net/gh/feathericons/feather/icons/user.svg"
+            async with roblox_client(Config.ROBLOX_COOKIE) as api:
+                for start in range(0, len(roblox_ids), 100):
+                    avatars.update(await api.get_user_avatar_urls(roblox_ids[start:start + 100]))
         except Exception as e:
-            print(f"Error getting host avatar: {e}")
-            return "https://cdn.jsdelivr.net/gh/feathericons/feather/icons/user.svg"
+            print(f"Error refreshing avatars: {e}")
+        if not avatars:
+            return
+        
+        expires_at = (datetime.utcnow() + timedelta(seconds=Config.AVATAR_CACHE_TTL)).isoformat()
+        
+        def store_avatars(user_data):
+            for roblox_id, avatar_url in avatars.items():
+                verification = user_data.get(stale.get(roblox_id), {}).get("verification")
+                if verification and verification.get("roblox_user_id") == roblox_id:
+                    verification["avatar_url"] = avatar_url
+                    verification["avatar_expires_at"] = expires_at
+        
+        await asyncio.to_thread(self.update_user_data, store_avatars)
+        for roblox_id, avatar_url in avatars.items():
+            if roblox_id in stale:
+                self.host_avatars[stale[roblox_id]] = avatar_url
+    
+    @refresh_avatars.before_loop
+    async def before_refresh_avatars(self):
+        await self.bot.wait_until_ready()
     
     @app_commands.command(name="tryout", description="Schedule a military tryout")
     @app_commands.describe(
         tryout_type="Type of tryout (e.g., Infantry, Armor, Aviation)",
         starts="When the tryout starts (e.g., '2pm EST', 'in 30 minutes')",
-        pad_number="Landing pad number (1-9)"
+        pad_number="Landing pad number (1-9)",
+        duration="How long the tryout lasts in minutes (default 60)"
     )
-    async def tryout(self, interaction: discord.Interaction, tryout_type: str, starts: str, pad_number: int):
+    async def tryout(self, interaction: discord.Interaction, tryout_type: str, starts: str, pad_number: int,
+                     duration: app_commands.Range[int, 5, 720] = Config.EVENT_DEFAULT_DURATION):
         """Handle tryout command"""
         
         # Validate pad number
@@ -70,6 +357,16 @@ class MilitaryCommands(commands.Cog):
         
         # Get host avatar
         host_avatar_url = await self.get_host_avatar(str(interaction.user.id))
+        await self.ensure_indexes()
+        tryout_type = self.canonical_type(interaction.guild, "tryouts", tryout_type)
+        start_time = parse_event_time(starts)
+        starts_at = start_time.isoformat() if start_time else None
+        
+        # Check the pad is free (no awaits between this check and reserving the slot below)
+        conflict = self.find_pad_conflict(interaction.guild, pad_number, start_time, duration)
+        if conflict:
+            await self.send_pad_conflict(interaction, pad_number, conflict)
+            return
         
         # Create embed
         embed = discord.Embed(
@@ -79,7 +376,7 @@ class MilitaryCommands(commands.Cog):
         )
         
         embed.add_field(name="Tryout Type", value=f"**{tryout_type}**", inline=True)
-        embed.add_field(name="Start Time", value=f"**{starts}**", inline=True)
+        embed.add_field(name="Start Time", value=format_event_time(f"**{starts}**", starts_at), inline=True)
         embed.add_field(name="Landing Pad", value=f"**Pad {pad_number}**", inline=True)
         embed.add_field(name="Organizer", value=interaction.user.mention, inline=False)
         
@@ -87,36 +384,53 @@ class MilitaryCommands(commands.Cog):
         embed.set_thumbnail(url=host_avatar_url)
         
         # Save tryout data
-        user_data = self.load_user_data()
         user_id = str(interaction.user.id)
-        
-        if user_id not in user_data:
-            user_data[user_id] = {"tryouts": [], "trainings": []}
-        
-        # Ensure tryouts array exists for existing users
-        if "tryouts" not in user_data[user_id]:
-            user_data[user_id]["tryouts"] = []
-        
         tryout_data = {
             "type": tryout_type,
             "starts": starts,
+            "starts_at": starts_at,
+            "duration": duration,
             "pad": pad_number,
             "timestamp": datetime.utcnow().isoformat(),
-            "guild_id": str(interaction.guild.id) if interaction.guild else "Unknown"
+            "guild_id": str(interaction.guild.id) if interaction.guild else "Unknown",
+            "channel_id": interaction.channel_id
         }
         
-        user_data[user_id]["tryouts"].append(tryout_data)
-        self.save_user_data(user_data)
+        def add_tryout(user_data):
+            if user_id not in user_data:
+                user_data[user_id] = {"tryouts": [], "trainings": []}
+            
+            # Ensure tryouts array exists for existing users
+            if "tryouts" not in user_data[user_id]:
+                user_data[user_id]["tryouts"] = []
+            
+            user_data[user_id]["tryouts"].append(tryout_data)
+        
+        # Reserve the slot before the first await so a concurrent booking sees it
+        self.index_event(user_id, "tryouts", tryout_data)
+        try:
+            await asyncio.to_thread(self.update_user_data, add_tryout)
+        except Exception:
+            self.unindex_event(user_id, "tryouts", tryout_data)
+            raise
+        self.record_event_type(tryout_data["guild_id"], "tryouts", tryout_type)
+        self.schedule_event_reminders(user_id, "tryouts", tryout_data)
         
         await interaction.response.send_message(embed=embed)
     
+    @tryout.autocomplete("tryout_type")
+    async def tryout_type_autocomplete(self, interaction: discord.Interaction, current: str):
+        return self.type_choices(interaction, "tryouts", current)
+    
     @app_commands.command(name="training", description="Schedule military training")
     @app_commands.describe(
         training_type="Type of training (e.g., Combat, Tactical, Physical)",
         starts="When the training starts (e.g., '3pm EST', 'tomorrow')",
-        pad_number="Training pad number (1-9)"
+        pad_number="Training pad number (1-9)",
+        duration="How long the training lasts in minutes (default 60)"
     )
-    async def training(self, interaction: discord.Interaction, training_type: str, starts: str, pad_number: int):
+    async def training(self, interaction: discord.Interaction, training_type: str, starts: str, pad_number: int,
+                       duration: app_commands.Range[int, 5, 720] = Config.EVENT_DEFAULT_DURATION):
         """Handle training command"""
         
         # Validate pad number
@@ -129,6 +443,16 @@ class MilitaryCommands(commands.Cog):
         
         # Get host avatar
         host_avatar_url = await self.get_host_avatar(str(interaction.user.id))
+        await self.ensure_indexes()
+        training_type = self.canonical_type(interaction.guild, "trainings", training_type)
+        start_time = parse_event_time(starts)
+        starts_at = start_time.isoformat() if start_time else None
+        
+        # Check the pad is free (no awaits between this check and reserving the slot below)
+        conflict = self.find_pad_conflict(interaction.guild, pad_number, start_time, duration)
+        if conflict:
+            await self.send_pad_conflict(interaction, pad_number, conflict)
+            return
         
         # Create embed
         embed = discord.Embed(
@@ -138,7 +462,7 @@ class MilitaryCommands(commands.Cog):
         )
         
         embed.add_field(name="Training Type", value=f"**{training_type}**", inline=True)
-        embed.add_field(name="Start Time", value=f"**{starts}**", inline=True)
+        embed.add_field(name="Start Time", value=format_event_time(f"**{starts}**", starts_at), inline=True)
         embed.add_field(name="Training Pad", value=f"**Pad {pad_number}**", inline=True)
         embed.add_field(name="Instructor", value=interaction.user.mention, inline=False)
         
@@ -146,29 +470,97 @@ class MilitaryCommands(commands.Cog):
         embed.set_thumbnail(url=host_avatar_url)
         
         # Save training data
-        user_data = self.load_user_data()
         user_id = str(interaction.user.id)
-        
-        if user_id not in user_data:
-            user_data[user_id] = {"tryouts": [], "trainings": []}
-        
-        # Ensure trainings array exists for existing users
-        if "trainings" not in user_data[user_id]:
-            user_data[user_id]["trainings"] = []
-        
         training_data = {
             "type": training_type,
             "starts": starts,
+            "starts_at": starts_at,
+            "duration": duration,
             "pad": pad_number,
             "timestamp": datetime.utcnow().isoformat(),
-            "guild_id": str(interaction.guild.id) if interaction.guild else "Unknown"
+            "guild_id": str(interaction.guild.id) if interaction.guild else "Unknown",
+            "channel_id": interaction.channel_id
         }
         
-        user_data[user_id]["trainings"].append(training_data)
-        self.save_user_data(user_data)
+        def add_training(user_data):
+            if user_id not in user_data:
+                user_data[user_id] = {"tryouts": [], "trainings": []}
+            
+            # Ensure trainings array exists for existing users
+            if "trainings" not in user_data[user_id]:
+                user_data[user_id]["trainings"] = []
+            
+            user_data[user_id]["trainings"].append(training_data)
+        
+        # Reserve the slot before the first await so a concurrent booking sees it
+        self.index_event(user_id, "trainings", training_data)
+        try:
+            await asyncio.to_thread(self.update_user_data, add_training)
+        except Exception:
+            self.unindex_event(user_id, "trainings", training_data)
+            raise
+        self.record_event_type(training_data["guild_id"], "trainings", training_type)
+        self.schedule_event_reminders(user_id, "trainings", training_data)
         
         await interaction.response.send_message(embed=embed)
     
+    @training.autocomplete("training_type")
+    async def training_type_autocomplete(self, interaction: discord.Interaction, current: str):
+        return self.type_choices(interaction, "trainings", current)
+    
+    @app_commands.command(name="pad_availability", description="Show free booking slots for the landing pads")
+    @app_commands.describe(
+        pad_number="Only show this pad (default: all pads)",
+        hours="How many hours ahead to look (default 12)"
+    )
+    async def pad_availability(self, interaction: discord.Interaction, pad_number: Optional[int] = None,
+                               hours: app_commands.Range[int, 1, 168] = 12):
+        """List the free slots of each pad for the coming hours"""
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        if pad_number is not None and not (Config.MIN_PAD_NUMBER <= pad_number <= Config.MAX_PAD_NUMBER):
+            await interaction.response.send_message(
+                f"❌ Pad number must be between {Config.MIN_PAD_NUMBER} and {Config.MAX_PAD_NUMBER}!",
+                ephemeral=True
+            )
+            return
+        await self.ensure_indexes()
+        
+        window_start = time.time()
+        window_end = window_start + hours * 3600
+        pads = [pad_number] if pad_number is not None else range(Config.MIN_PAD_NUMBER, Config.MAX_PAD_NUMBER + 1)
+        
+        embed = discord.Embed(
+            title="🛬 Pad Availability",
+            description=f"Free slots from now until <t:{int(window_end)}:f>",
+            color=Config.COLORS['info'],
+            timestamp=datetime.utcnow()
+        )
+        for pad in pads:
+            slots = self.pad_index.free_slots(interaction.guild.id, pad, window_start, window_end, min_length=15 * 60)
+            if not slots:
+                value = "❌ Fully booked"
+            elif slots == [(window_start, window_end)]:
+                value = "✅ Free the whole time"
+            else:
+                value = "\n".join(f"<t:{int(start)}:t> – <t:{int(end)}:t>" for start, end in slots[:8])
+            embed.add_field(name=f"Pad {pad}", value=value, inline=pad_number is None)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="events", description="Browse upcoming tryouts and trainings in this server")
+    async def events(self, interaction: discord.Interaction):
+        """Paginated guild-wide board of upcoming events"""
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        await self.ensure_indexes()
+        
+        # Include events that started within the last hour as still running
+        view = EventsPageView(self, interaction.guild, interaction.user.id, after=time.time() - 3600)
+        await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+    
     @app_commands.command(name="schedule", description="View your scheduled tryouts and trainings")
     async def schedule(self, interaction: discord.Interaction):
         """View user's scheduled events"""
@@ -194,7 +586,7 @@ class MilitaryCommands(commands.Cog):
         if tryouts:
             tryout_list = []
             for i, tryout in enumerate(tryouts[-5:], 1):  # Show last 5
-                tryout_list.append(f"{i}. **{tryout['type']}** - {tryout['starts']} (Pad {tryout['pad']})")
+                tryout_list.append(f"{i}. **{tryout['type']}** - {format_event_time(tryout['starts'], tryout.get('starts_at'))} (Pad {tryout['pad']})")
             embed.add_field(
                 name="🎖️ Recent Tryouts",
                 value="\n".join(tryout_list),
@@ -204,7 +596,7 @@ class MilitaryCommands(commands.Cog):
         if trainings:
             training_list = []
             for i, training in enumerate(trainings[-5:], 1):  # Show last 5
-                training_list.append(f"{i}. **{training['type']}** - {training['starts']} (Pad {training['pad']})")
+                training_list.append(f"{i}. **{training['type']}** - {format_event_time(training['starts'], training.get('starts_at'))} (Pad {training['pad']})")
             embed.add_field(
                 name="🏋️ Recent Trainings",
                 value="\n".join(training_list),
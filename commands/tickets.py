@@ -2,17 +2,43 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import json
-import os
+import hashlib
+import asyncio
 from datetime import datetime
 from config import Config
+from utils.ticket_stats import TicketStats, format_duration
+from utils.member_stats import MemberStatsTracker
+from utils.guild_config import GuildConfigStore
+from utils.scheduler import StaggeredScheduler
+from utils.storage import load_json, update_json
+from utils.metrics import CACHE_REQUESTS, QUEUE_DEPTH
+from utils.tracing import tracer, span
+from utils.profiler import command_profiler
+from utils.shutdown import shutdown
+from utils.throttle import allow_interaction
+
+def get_ticket_stats(client):
+    """Get the shared ticket stats aggregator from the tickets cog"""
+    cog = client.get_cog("TicketCommands")
+    return cog.ticket_stats if cog else None
 
 class TicketView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)  # Never expires
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if not await shutdown.admit(interaction):
+            return False
+        return await allow_interaction("ticket_open", interaction)
         
     @discord.ui.button(label='🎫 Open Ticket', style=discord.ButtonStyle.success, emoji='🎫', custom_id='open_ticket')
     async def open_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle ticket creation"""
+        with tracer.trace("ticket_open", interaction.id, user_id=interaction.user.id):
+            await self.create_ticket(interaction)
+    
+    async def create_ticket(self, interaction: discord.Interaction):
+        """Create the ticket channel and post the ticket message"""
         await interaction.response.defer(ephemeral=True)
         
         # Check if command is used in a guild
@@ -43,7 +69,8 @@ class TicketView(discord.ui.View):
         # Create ticket category if it doesn't exist
         category = discord.utils.get(guild.categories, name="🎫 Support Tickets")
         if not category:
-            category = await guild.create_category("🎫 Support Tickets")
+            with span("guild.create_category"):
+                category = await guild.create_category("🎫 Support Tickets")
         
         # Create ticket channel
         channel_name = f"ticket-{user.id}"
@@ -56,7 +83,7 @@ class TicketView(discord.ui.View):
         }
         
         # Add support role permissions
-        support_role = guild.get_role(1385451612650344523)
+        support_role = guild.get_role(Config.SUPPORT_ROLE_ID)
         if support_role:
             overwrites[support_role] = discord.PermissionOverwrite(
                 read_messages=True, 
@@ -65,11 +92,12 @@ class TicketView(discord.ui.View):
             )
         
         # Create the channel
-        ticket_channel = await guild.create_text_channel(
-            name=channel_name,
-            category=category,
-            overwrites=overwrites
-        )
+        with span("guild.create_text_channel"):
+            ticket_channel = await guild.create_text_channel(
+                name=channel_name,
+                category=category,
+                overwrites=overwrites
+            )
         
         # Create ticket embed
         embed = discord.Embed(
@@ -101,11 +129,12 @@ class TicketView(discord.ui.View):
         close_view = CloseTicketView()
         
         # Send ticket message
-        await ticket_channel.send(
-            content=f"{user.mention} {f'{support_role.mention}' if support_role else ''}",
-            embed=embed,
-            view=close_view
-        )
+        with span("channel.send"):
+            await ticket_channel.send(
+                content=f"{user.mention} {f'{support_role.mention}' if support_role else ''}",
+                embed=embed,
+                view=close_view
+            )
         
         # Save ticket data
         ticket_data = {
@@ -117,6 +146,10 @@ class TicketView(discord.ui.View):
         
         await self.save_ticket_data(ticket_data)
         
+        ticket_stats = get_ticket_stats(interaction.client)
+        if ticket_stats:
+            ticket_stats.ticket_opened(ticket_channel.guild.id, ticket_channel.id, user.id)
+        
         await interaction.followup.send(
             f"✅ Ticket created successfully! {ticket_channel.mention}",
             ephemeral=True
@@ -124,32 +157,27 @@ class TicketView(discord.ui.View):
     
     async def save_ticket_data(self, ticket_data):
         """Save ticket data to JSON file"""
-        os.makedirs("data", exist_ok=True)
-        tickets_file = "data/tickets.json"
+        # Add new ticket to the existing tickets
+        def add_ticket(tickets):
+            tickets[str(ticket_data["channel_id"])] = ticket_data
         
-        # Load existing tickets
-        tickets = {}
-        if os.path.exists(tickets_file):
-            try:
-                with open(tickets_file, 'r') as f:
-                    tickets = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                tickets = {}
-        
-        # Add new ticket
-        tickets[str(ticket_data["channel_id"])] = ticket_data
-        
-        # Save tickets
-        with open(tickets_file, 'w') as f:
-            json.dump(tickets, f, indent=2)
+        await asyncio.to_thread(update_json, Config.TICKETS_FILE, add_ticket)
 
 class CloseTicketView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return await shutdown.admit(interaction)
         
     @discord.ui.button(label='🔒 Close Ticket', style=discord.ButtonStyle.danger, emoji='🔒', custom_id='close_ticket')
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle ticket closure"""
+        with tracer.trace("ticket_close", interaction.id, user_id=interaction.user.id):
+            await self.run_close(interaction)
+    
+    async def run_close(self, interaction: discord.Interaction):
+        """Record the closure, announce it and delete the channel"""
         await interaction.response.defer()
         
         # Check if command is used in a guild
@@ -162,7 +190,7 @@ class CloseTicketView(discord.ui.View):
         
         guild = interaction.guild
         user = interaction.user
-        support_role = guild.get_role(1385451612650344523)
+        support_role = guild.get_role(Config.SUPPORT_ROLE_ID)
         
         # Check if user is the ticket owner or has support role
         if isinstance(interaction.channel, discord.TextChannel):
@@ -196,6 +224,9 @@ class CloseTicketView(discord.ui.View):
         # Update ticket data
         if hasattr(interaction.channel, 'id'):
             await self.update_ticket_status(interaction.channel.id, "closed")
+            ticket_stats = get_ticket_stats(interaction.client)
+            if ticket_stats:
+                ticket_stats.ticket_closed(interaction.channel.id)
         
         # Send closing message
         await interaction.followup.send(embed=transcript_embed)
@@ -203,42 +234,277 @@ class CloseTicketView(discord.ui.View):
         # Wait a moment then delete the channel
         await interaction.followup.send("🔒 This ticket will be deleted in 10 seconds...")
         
-        import asyncio
-        await asyncio.sleep(10)
+        # Cut short when the bot is shutting down so the deletion isn't lost
+        with span("close_delay"):
+            await shutdown.sleep(10)
         
         try:
             if isinstance(interaction.channel, discord.TextChannel):
-                await interaction.channel.delete(reason=f"Ticket closed by {user}")
+                with span("channel.delete"):
+                    await interaction.channel.delete(reason=f"Ticket closed by {user}")
         except (discord.NotFound, discord.Forbidden):
             pass  # Channel already deleted or no permission
     
     async def update_ticket_status(self, channel_id, status):
         """Update ticket status in JSON file"""
-        tickets_file = "data/tickets.json"
+        def set_status(tickets):
+            if str(channel_id) in tickets:
+                tickets[str(channel_id)]["status"] = status
+                tickets[str(channel_id)]["closed_at"] = datetime.utcnow().isoformat()
         
-        if os.path.exists(tickets_file):
-            try:
-                with open(tickets_file, 'r') as f:
-                    tickets = json.load(f)
-                
-                if str(channel_id) in tickets:
-                    tickets[str(channel_id)]["status"] = status
-                    tickets[str(channel_id)]["closed_at"] = datetime.utcnow().isoformat()
-                    
-                    with open(tickets_file, 'w') as f:
-                        json.dump(tickets, f, indent=2)
-            except (FileNotFoundError, json.JSONDecodeError):
-                pass
+        await asyncio.to_thread(update_json, Config.TICKETS_FILE, set_status)
 
 class TicketCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.member_count_channel_id = 1384582591516119151
-        self.ticket_channel_id = 1384585517730893864
-        self.update_member_count.start()
+        # Stores are loaded on first use or by warm_up() after the bot is ready
+        self._guild_config = None
+        self._ticket_stats = None
+        self._stats_messages = None
+        self.member_stats = MemberStatsTracker()
+        self.stats_scheduler = StaggeredScheduler(
+            self.refresh_guild_stats,
+            window=Config.STATS_REFRESH_WINDOW,
+            min_interval=Config.STATS_MIN_INTERVAL,
+            max_interval=Config.STATS_MAX_INTERVAL
+        )
+    
+    @property
+    def guild_config(self) -> GuildConfigStore:
+        if self._guild_config is None:
+            self._guild_config = GuildConfigStore(Config.GUILD_CONFIG_FILE)
+        return self._guild_config
+    
+    @property
+    def ticket_stats(self) -> TicketStats:
+        if self._ticket_stats is None:
+            self._ticket_stats = TicketStats(Config.TICKET_STATS_FILE)
+        return self._ticket_stats
+    
+    @property
+    def stats_messages(self) -> dict:
+        if self._stats_messages is None:
+            self._stats_messages = self.load_stats_messages()
+        return self._stats_messages
+    
+    async def cog_load(self):
+        QUEUE_DEPTH.set_function(lambda: len(self.stats_scheduler), queue="stats_refresh")
+    
+    async def warm_up(self):
+        """Load stores off the event loop and start the statistics refresh loop (run after ready)"""
+        guild_config = await asyncio.to_thread(GuildConfigStore, Config.GUILD_CONFIG_FILE)
+        ticket_stats = await asyncio.to_thread(TicketStats, Config.TICKET_STATS_FILE)
+        stats_messages = await asyncio.to_thread(self.load_stats_messages)
+        # Keep anything that was already loaded (and possibly changed) on first use
+        if self._guild_config is None:
+            self._guild_config = guild_config
+        if self._ticket_stats is None:
+            self._ticket_stats = ticket_stats
+        if self._stats_messages is None:
+            self._stats_messages = stats_messages
+        if self._ticket_stats.legacy is not None:
+            # Old global stats can only be attributed when there is a single guild
+            self._ticket_stats.adopt_legacy(self.bot.guilds[0].id if len(self.bot.guilds) == 1 else None)
+        self.stats_scheduler.start()
+        if not self.save_ticket_stats.is_running():
+            self.save_ticket_stats.start()
     
     async def cog_unload(self):
-        self.update_member_count.cancel()
+        self.stats_scheduler.stop()
+        self.save_ticket_stats.cancel()
+    
+    @tasks.loop(seconds=Config.TICKET_STATS_SAVE_INTERVAL)
+    async def save_ticket_stats(self):
+        """Write changed ticket statistics off the event loop"""
+        ticket_stats = self._ticket_stats
+        if ticket_stats is not None and ticket_stats.dirty:
+            await asyncio.to_thread(ticket_stats.write, ticket_stats.snapshot())
+    
+    def flush(self):
+        """Persist in-memory ticket statistics (called during shutdown)"""
+        self.save_ticket_stats.cancel()
+        if self._ticket_stats is not None and self._ticket_stats.dirty:
+            self._ticket_stats.save()
+    
+    def get_configured_channel(self, guild: discord.Guild, key: str, default_id: int):
+        """Resolve a per-guild channel setting, falling back to the legacy default"""
+        channel = self.bot.get_channel(self.guild_config.get(guild.id, key, default_id))
+        if isinstance(channel, discord.TextChannel) and channel.guild.id == guild.id:
+            return channel
+        return None
+    
+    def load_stats_messages(self):
+        """Load persisted statistics message handles from JSON file"""
+        return load_json(Config.STATS_MESSAGES_FILE)
+    
+    async def remember_stats_message(self, guild_id, channel_id, message_id, fingerprint):
+        """Store the statistics message handle and the hash of its last rendered content"""
+        handle = {
+            "channel_id": channel_id,
+            "message_id": message_id,
+            "hash": fingerprint
+        }
+        self.stats_messages[str(guild_id)] = handle
+        
+        # Merge into the file so other clusters' handles are kept
+        def store_handle(stats_messages):
+            stats_messages[str(guild_id)] = handle
+        
+        await asyncio.to_thread(update_json, Config.STATS_MESSAGES_FILE, store_handle)
+    
+    @staticmethod
+    def embed_fingerprint(embed: discord.Embed) -> str:
+        """Hash an embed's payload, ignoring fields that change on every render"""
+        payload = embed.to_dict()
+        payload.pop("timestamp", None)
+        payload["fields"] = [
+            field for field in payload.get("fields", [])
+            if field.get("name") != "🕐 Last Updated"
+        ]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        self.member_stats.seed(guild)
+        self.stats_scheduler.add(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.member_stats.seed(guild)
+        self.stats_scheduler.add(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.member_stats.forget(guild.id)
+        self.stats_scheduler.remove(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.member_stats.member_joined(member)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.member_stats.member_left(member)
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        self.member_stats.voice_changed(member, before, after)
+    
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        self.member_stats.presence_changed(before, after)
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Feed ticket channel messages into the SLA aggregates"""
+        if message.author.bot or not message.guild:
+            return
+        channel = message.channel
+        if not isinstance(channel, discord.TextChannel) or not channel.name.startswith('ticket-'):
+            return
+        
+        # Tickets opened before tracking started are picked up lazily, closed ones never
+        if not self.ticket_stats.is_tracked(channel.id):
+            owner_id = channel.name.split('-')[1]
+            if not owner_id.isdigit() or self.ticket_stats.was_closed(channel.id):
+                return
+            status = await asyncio.to_thread(self.ticket_status, channel.id)
+            if status == "closed":
+                self.ticket_stats.mark_closed(channel.id)
+                return
+            self.ticket_stats.ticket_opened(channel.guild.id, channel.id, int(owner_id), channel.created_at.timestamp())
+        
+        if str(message.author.id) == channel.name.split('-')[1]:
+            return
+        
+        is_staff = isinstance(message.author, discord.Member) and (
+            any(role.id == Config.SUPPORT_ROLE_ID for role in message.author.roles)
+            or message.author.guild_permissions.manage_messages
+        )
+        self.ticket_stats.record_message(channel.id, is_staff, message.created_at.timestamp())
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Close tickets whose channel was deleted without the close button"""
+        if not isinstance(channel, discord.TextChannel) or not channel.name.startswith('ticket-'):
+            return
+        if self.ticket_stats.was_closed(channel.id):
+            return  # Closed through the button, already recorded
+        self.ticket_stats.ticket_closed(channel.id)
+        
+        def set_closed(tickets):
+            ticket = tickets.get(str(channel.id))
+            if ticket and ticket.get("status") != "closed":
+                ticket["status"] = "closed"
+                ticket["closed_at"] = datetime.utcnow().isoformat()
+        
+        try:
+            await asyncio.to_thread(update_json, Config.TICKETS_FILE, set_closed)
+        except Exception as e:
+            print(f"Error closing deleted ticket {channel.id}: {e}")
+    
+    def ticket_status(self, channel_id):
+        """Status of a ticket in the tickets file, None if it isn't there"""
+        return load_json(Config.TICKETS_FILE).get(str(channel_id), {}).get("status")
+    
+    @app_commands.command(name="ticket_stats", description="View ticket response and resolution statistics (Staff only)")
+    async def ticket_stats_command(self, interaction: discord.Interaction):
+        """Show precomputed ticket SLA statistics"""
+        if not isinstance(interaction.user, discord.Member) or not (
+            interaction.user.guild_permissions.administrator
+            or any(role.id == Config.SUPPORT_ROLE_ID for role in interaction.user.roles)
+        ):
+            await interaction.response.send_message(
+                "❌ Only support staff can view ticket statistics!",
+                ephemeral=True
+            )
+            return
+        
+        summary = self.ticket_stats.summary(interaction.guild.id)
+        
+        embed = discord.Embed(
+            title="🎫 Ticket Statistics",
+            color=Config.COLORS['info'],
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.add_field(
+            name="📂 Open Backlog",
+            value=f"**Open:** {summary['open']}\n**Awaiting response:** {summary['awaiting_response']}",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="✅ Closed",
+            value=f"**Total:** {summary['closed_total']:,}\n**Closed without response:** {summary['unanswered_closed']:,}",
+            inline=True
+        )
+        
+        response = summary['first_response']
+        embed.add_field(
+            name="⏱️ First Staff Response",
+            value=f"**p50:** {format_duration(response[0.5])}\n**p90:** {format_duration(response[0.9])}\n**p99:** {format_duration(response[0.99])}\n*({summary['responses_measured']:,} measured)*",
+            inline=False
+        )
+        
+        close = summary['time_to_close']
+        embed.add_field(
+            name="🔒 Time to Close",
+            value=f"**p50:** {format_duration(close[0.5])}\n**p90:** {format_duration(close[0.9])}\n**p99:** {format_duration(close[0.99])}",
+            inline=False
+        )
+        
+        backlog = self.ticket_stats.backlog_series(interaction.guild.id, hours=24)
+        peak = max(backlog) if backlog else 0
+        bars = "▁▂▃▄▅▆▇█"
+        sparkline = "".join(bars[min(len(bars) - 1, count * (len(bars) - 1) // peak)] if peak else bars[0] for count in backlog)
+        embed.add_field(
+            name="📈 Open Backlog (last 24h, hourly peak)",
+            value=f"`{sparkline}` peak {peak}",
+            inline=False
+        )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
     
     @app_commands.command(name="sync_commands", description="Force sync all commands to this server (Admin only)")
     async def sync_commands(self, interaction: discord.Interaction):
@@ -253,8 +519,8 @@ class TicketCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Sync commands to this specific guild
-            synced = await self.bot.tree.sync(guild=interaction.guild)
+            # Force sync commands to this specific guild, bypassing the hash check
+            synced = await self.bot.command_sync.sync(guild=interaction.guild, force=True)
             await interaction.followup.send(
                 f"Successfully synced {len(synced)} commands to this server! All commands should now be available.",
                 ephemeral=True
@@ -279,10 +545,10 @@ class TicketCommands(commands.Cog):
         await interaction.response.defer()
         
         # Get the ticket channel
-        ticket_channel = self.bot.get_channel(self.ticket_channel_id)
+        ticket_channel = self.get_configured_channel(interaction.guild, "ticket_channel_id", Config.DEFAULT_TICKET_CHANNEL_ID)
         if not ticket_channel:
             await interaction.followup.send(
-                f"❌ Could not find ticket channel with ID: {self.ticket_channel_id}",
+                "❌ No ticket channel is configured for this server. Use `/set_ticket_channel` first.",
                 ephemeral=True
             )
             return
@@ -336,61 +602,70 @@ class TicketCommands(commands.Cog):
             ephemeral=True
         )
     
-    @tasks.loop(minutes=5)  # Update every 5 minutes
-    async def update_member_count(self):
+    @app_commands.command(name="set_stats_channel", description="Set the live server statistics channel (Admin only)")
+    @app_commands.describe(channel="Channel where the statistics message is kept up to date")
+    async def set_stats_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        """Configure this guild's statistics channel"""
+        if not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+        
+        await self.guild_config.set(interaction.guild.id, "stats_channel_id", channel.id)
+        self.stats_scheduler.refresh_soon(interaction.guild.id)
+        await interaction.response.send_message(
+            f"✅ Server statistics will be posted in {channel.mention}.",
+            ephemeral=True
+        )
+    
+    @app_commands.command(name="set_ticket_channel", description="Set the channel used by /setup_tickets (Admin only)")
+    @app_commands.describe(channel="Channel where the ticket panel is posted")
+    async def set_ticket_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        """Configure this guild's ticket panel channel"""
+        if not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                "❌ You need Administrator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+        
+        await self.guild_config.set(interaction.guild.id, "ticket_channel_id", channel.id)
+        await interaction.response.send_message(
+            f"✅ Ticket panel channel set to {channel.mention}.",
+            ephemeral=True
+        )
+    
+    async def refresh_guild_stats(self, guild_id: int) -> int:
+        """Scheduler callback, returns the guild's activity since the last refresh"""
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            self.stats_scheduler.remove(guild_id)
+            return 0
+        activity = self.member_stats.take_events(guild_id)
+        with command_profiler.scope("update_member_count"):
+            await self.update_member_count(guild)
+        return activity
+    
+    async def update_member_count(self, guild: discord.Guild):
         """Update member count with server activity"""
         try:
-            channel = self.bot.get_channel(self.member_count_channel_id)
-            if not channel or not isinstance(channel, discord.TextChannel):
+            channel = self.get_configured_channel(guild, "stats_channel_id", Config.DEFAULT_STATS_CHANNEL_ID)
+            if not channel:
                 return
             
-            guild = channel.guild
-            
-            # Calculate member statistics using available data
-            total_members = guild.member_count or 0
-            
-            # Count voice channel members for active users
-            voice_members = 0
-            for voice_channel in guild.voice_channels:
-                voice_members += len(voice_channel.members)
-            
-            # Use presence information when available
-            online_count = 0
-            idle_count = 0
-            dnd_count = 0
-            offline_count = 0
-            
-            # Count members we can see (limited without privileged intents)
-            visible_members = 0
-            for member in guild.members:
-                visible_members += 1
-                try:
-                    if member.status == discord.Status.online:
-                        online_count += 1
-                    elif member.status == discord.Status.idle:
-                        idle_count += 1
-                    elif member.status == discord.Status.dnd:
-                        dnd_count += 1
-                    else:
-                        offline_count += 1
-                except:
-                    # Status unavailable, count as offline
-                    offline_count += 1
-            
-            # If we can't see many members, estimate based on voice activity and typical patterns
-            if visible_members < total_members * 0.1:  # Less than 10% visible
-                # Base estimate on voice channel activity and typical Discord usage patterns
-                estimated_online = max(voice_members * 2, total_members * 0.15)  # At least 15% typically online
-                estimated_online = min(estimated_online, total_members * 0.6)  # Cap at 60%
-                
-                online_count = int(estimated_online * 0.4)  # 40% fully online
-                idle_count = int(estimated_online * 0.35)   # 35% idle
-                dnd_count = int(estimated_online * 0.25)    # 25% DND
-                offline_count = total_members - online_count - idle_count - dnd_count
-                
-                online_members = online_count + idle_count + dnd_count
-            else:
-                online_members = online_count + idle_count + dnd_count
+            # Render the incrementally maintained counters (no member scan)
+            stats = self.member_stats.snapshot(guild)
+            total_members = stats["total_members"]
+            online_members = stats["online_members"]
+            online_count = stats["online"]
+            idle_count = stats["idle"]
+            dnd_count = stats["dnd"]
+            offline_count = stats["offline"]
+            visible_members = stats["visible_members"]
+            voice_members = stats["voice_members"]
             
             # Calculate activity percentage
             activity_percentage = (online_members / total_members * 100) if total_members > 0 else 0
@@ -456,7 +731,7 @@ class TicketCommands(commands.Cog):
             status_text = "\n".join([f"{emoji} {count:,}" for emoji, count in status_counts.items()])
             
             # Add debug info about data visibility
-            if visible_members < total_members * 0.1:
+            if stats["estimated"]:
                 status_text += f"\n⚠️ Estimated (visible: {visible_members}/{total_members})"
                 if voice_members > 0:
                     status_text += f"\n🎤 Voice active: {voice_members}"
@@ -479,26 +754,42 @@ class TicketCommands(commands.Cog):
             else:
                 embed.set_footer(text=f"{guild.name} • Live Statistics")
             
-            # Get recent messages to edit or send new one
+            # Skip the edit entirely when the rendered statistics haven't changed
+            fingerprint = self.embed_fingerprint(embed)
+            handle = self.stats_messages.get(str(guild.id))
+            if handle and handle.get("channel_id") == channel.id and handle.get("hash") == fingerprint:
+                CACHE_REQUESTS.inc(cache="stats_render", result="hit")
+                return
+            CACHE_REQUESTS.inc(cache="stats_render", result="miss")
+            
             try:
+                # Reuse the stored message handle, only scanning history when it's missing
+                if handle and handle.get("channel_id") == channel.id:
+                    try:
+                        await channel.get_partial_message(handle["message_id"]).edit(embed=embed)
+                        CACHE_REQUESTS.inc(cache="stats_message", result="hit")
+                        await self.remember_stats_message(guild.id, channel.id, handle["message_id"], fingerprint)
+                        return
+                    except discord.NotFound:
+                        pass  # Message was deleted, fall back to a history scan
+                
+                CACHE_REQUESTS.inc(cache="stats_message", result="miss")
                 async for message in channel.history(limit=10):
                     if message.author == self.bot.user and message.embeds:
-                        if "Server Statistics" in message.embeds[0].title:
+                        if "Server Statistics" in (message.embeds[0].title or ""):
                             await message.edit(embed=embed)
+                            await self.remember_stats_message(guild.id, channel.id, message.id, fingerprint)
                             return
                 
                 # If no existing message found, send new one
-                await channel.send(embed=embed)
+                message = await channel.send(embed=embed)
+                await self.remember_stats_message(guild.id, channel.id, message.id, fingerprint)
                 
             except discord.HTTPException:
                 pass  # Failed to update, will try again next loop
                 
         except Exception as e:
             print(f"Error updating member count: {e}")
-    
-    @update_member_count.before_loop
-    async def before_update_member_count(self):
-        await self.bot.wait_until_ready()
 
 async def setup(bot):
     await bot.add_cog(TicketCommands(bot))
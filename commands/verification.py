@@ -5,10 +5,17 @@ import json
 import random
 import string
 import asyncio
+import time
 from datetime import datetime, timedelta
 from config import Config
-from utils.ranks import get_nato_rank, RANK_MAPPING, format_nickname
-from utils.roblox_api import verify_roblox_user
+from utils.ranks import resolve_group_ranks, format_nickname
+from utils.roblox_api import verify_roblox_user, roblox_client, unavailable_result
+from utils.circuit_breaker import CircuitOpenError, roblox_breaker
+from utils.storage import load_json, save_json, update_json
+from utils.tracing import tracer, span
+from utils.shutdown import shutdown
+from utils.role_sync import INTERACTIVE
+from utils.throttle import throttled, allow_interaction
 
 class VerificationView(discord.ui.View):
     def __init__(self, verification_code, user_id, roblox_username):
@@ -18,8 +25,19 @@ class VerificationView(discord.ui.View):
         self.roblox_username = roblox_username
         self.verified = False
     
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if not await shutdown.admit(interaction):
+            return False
+        # Each press triggers Roblox lookups
+        return await allow_interaction("verify_button", interaction)
+    
     @discord.ui.button(label='Verify', style=discord.ButtonStyle.success, emoji='✅')
     async def verify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        with tracer.trace("verify_button", interaction.id, user_id=interaction.user.id, roblox_username=self.roblox_username):
+            await self.run_verification(interaction, button)
+    
+    async def run_verification(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Check the code on Roblox, update the nickname and store the verification"""
         if interaction.user.id != self.user_id:
             await interaction.response.send_message(
                 "❌ You can only verify your own account!",
@@ -48,32 +66,71 @@ class VerificationView(discord.ui.View):
             ephemeral=True
         )
         
-        # Use real Roblox API to verify user
-        try:
-            verification_result = await verify_roblox_user(
-                Config.ROBLOX_COOKIE, 
-                self.roblox_username, 
-                self.verification_code, 
-                Config.ROBLOX_GROUP_ID
-            )
+        # While Roblox is down, hold the verification and retry once the circuit breaker
+        # lets requests through. Only one caller gets the half-open probe, so the rest
+        # see another "unavailable" result and go back to waiting until it closes.
+        deadline = time.monotonic() + Config.ROBLOX_RECOVERY_WAIT
+        queued = False
+        while True:
+            if not roblox_breaker.available:
+                if not queued:
+                    queued = True
+                    await interaction.followup.send(
+                        "⚠️ Roblox is having problems right now. Your verification is queued and will "
+                        "continue automatically once it recovers.",
+                        ephemeral=True
+                    )
+                if not await roblox_breaker.wait_until_available(deadline - time.monotonic()):
+                    await interaction.followup.send(
+                        "❌ Roblox is still unavailable. Please try verifying again later.",
+                        ephemeral=True
+                    )
+                    return
             
-            if not verification_result or not verification_result.get('success'):
-                error_message = verification_result.get('error', 'Unknown error') if verification_result else 'API connection failed'
+            # Use real Roblox API to verify user
+            try:
+                verification_result = await verify_roblox_user(
+                    Config.ROBLOX_COOKIE, 
+                    self.roblox_username, 
+                    self.verification_code, 
+                    Config.ROBLOX_GROUP_ID,
+                    Config.ROBLOX_SUBGROUP_IDS
+                )
+            except CircuitOpenError:
+                verification_result = unavailable_result()  # Refused by the breaker before reaching a worker
+            except Exception as e:
                 await interaction.followup.send(
-                    f"❌ Verification failed: {error_message}",
+                    f"❌ API Error: {str(e)}",
                     ephemeral=True
                 )
                 return
-        except Exception as e:
+            
+            retry = (
+                verification_result and verification_result.get('unavailable')
+                and not roblox_breaker.available and time.monotonic() < deadline
+            )
+            if not retry:
+                break
+        
+        if not verification_result or not verification_result.get('success'):
+            error_message = verification_result.get('error', 'Unknown error') if verification_result else 'API connection failed'
             await interaction.followup.send(
-                f"❌ API Error: {str(e)}",
+                f"❌ Verification failed: {error_message}",
                 ephemeral=True
             )
             return
         
-        # Get NATO rank from Roblox rank ID
-        roblox_rank_id = verification_result['rank_id']
-        nato_rank = get_nato_rank(roblox_rank_id)
+        # The first group in precedence order the user belongs to decides the nickname
+        groups = verification_result.get('groups') or {
+            Config.ROBLOX_GROUP_ID: {'rank_id': verification_result['rank_id'], 'rank_name': verification_result['rank_name']}
+        }
+        nickname_group_id, group_ranks = resolve_group_ranks(groups, interaction.guild_id)
+        
+        # Get NATO rank from the deciding group's Roblox rank ID using this guild's rank table
+        rank = group_ranks[nickname_group_id]
+        roblox_rank_id = groups[nickname_group_id]['rank_id']
+        rank_name = groups[nickname_group_id]['rank_name']
+        nato_rank = rank.code
         
         # Use the actual username from Roblox API response
         actual_username = verification_result['username']
@@ -85,10 +142,16 @@ class VerificationView(discord.ui.View):
         )
         
         embed.add_field(name="Roblox Username", value=actual_username, inline=True)
-        embed.add_field(name="Rank", value=f"{nato_rank} ({verification_result['rank_name']})", inline=True)
-        embed.add_field(name="Group ID", value=str(Config.ROBLOX_GROUP_ID), inline=True)
+        embed.add_field(name="Rank", value=f"{nato_rank} ({rank_name})", inline=True)
+        embed.add_field(name="Group ID", value=str(nickname_group_id), inline=True)
+        if len(groups) > 1:
+            embed.add_field(
+                name="Group Ranks",
+                value="\n".join(f"`{group_id}`: {group_ranks[group_id].code} ({info['rank_name']})" for group_id, info in groups.items()),
+                inline=False
+            )
         
-        new_nickname = format_nickname(nato_rank, actual_username)
+        new_nickname = format_nickname(rank, actual_username)
         embed.add_field(name="New Nickname", value=new_nickname, inline=False)
         
         # Attempt to change nickname
@@ -103,47 +166,71 @@ class VerificationView(discord.ui.View):
                     target_member = interaction.guild.get_member(interaction.user.id)
                 
                 if target_member:
-                    await target_member.edit(nick=new_nickname)
-                    embed.add_field(name="Status", value="Nickname updated successfully!", inline=False)
+                    # Nickname and rank roles in one member edit, through the shared rate-limited queue
+                    with span("role_sync", nick=new_nickname):
+                        diff = await interaction.client.role_sync.submit(target_member, rank, new_nickname, priority=INTERACTIVE)
+                    if diff.empty:
+                        status = "Nickname and roles already up to date"
+                    else:
+                        status = "Nickname and roles updated successfully!"
+                        if diff.add:
+                            status += f"\nAdded: {', '.join(role.mention for role in diff.add)}"
+                        if diff.remove:
+                            status += f"\nRemoved: {', '.join(role.mention for role in diff.remove)}"
+                    embed.add_field(name="Status", value=status, inline=False)
                 else:
                     embed.add_field(name="Status", value="Could not find member in guild. Try running the command in the server.", inline=False)
             else:
                 embed.add_field(name="Status", value="Command must be used in a server", inline=False)
         except discord.Forbidden:
-            embed.add_field(name="Status", value="Could not update nickname (bot needs 'Manage Nicknames' permission)", inline=False)
+            embed.add_field(name="Status", value="Could not update nickname or roles (bot needs 'Manage Nicknames' and 'Manage Roles' permissions)", inline=False)
         except Exception as e:
             embed.add_field(name="Status", value=f"Error updating nickname: {str(e)}", inline=False)
         
         # Save verification data
         try:
-            import json
-            import os
-            
-            # Ensure data file exists
-            os.makedirs("data", exist_ok=True)
-            if not os.path.exists(Config.USER_DATA_FILE):
-                with open(Config.USER_DATA_FILE, 'w') as f:
-                    json.dump({}, f)
-            
-            # Load, update, and save user data
-            with open(Config.USER_DATA_FILE, 'r') as f:
-                user_data = json.load(f)
-            
             user_id = str(interaction.user.id)
-            user_data[user_id] = user_data.get(user_id, {})
-            user_data[user_id]["verification"] = {
+            verification = {
                 "verified": True,
                 "roblox_username": actual_username,
                 "roblox_user_id": verification_result['user_id'],
                 "rank": nato_rank,
-                "rank_name": verification_result['rank_name'],
-                "rank_id": verification_result['rank_id'],
+                "rank_name": rank_name,
+                "rank_id": roblox_rank_id,
+                "nickname_group_id": nickname_group_id,
+                "groups": {
+                    str(group_id): {
+                        "rank_id": info['rank_id'],
+                        "rank_name": info['rank_name'],
+                        "rank": group_ranks[group_id].code
+                    }
+                    for group_id, info in groups.items()
+                },
                 "verification_date": datetime.utcnow().isoformat(),
                 "guild_id": str(interaction.guild.id) if interaction.guild else "unknown"
             }
             
-            with open(Config.USER_DATA_FILE, 'w') as f:
-                json.dump(user_data, f, indent=2)
+            # Fetch the avatar now so event embeds never need a Roblox call
+            try:
+                with span("roblox.avatar"):
+                    async with roblox_client(Config.ROBLOX_COOKIE) as api:
+                        avatar_url = await api.get_user_avatar_url(verification_result['user_id'])
+                if avatar_url:
+                    verification["avatar_url"] = avatar_url
+                    verification["avatar_expires_at"] = (datetime.utcnow() + timedelta(seconds=Config.AVATAR_CACHE_TTL)).isoformat()
+            except Exception as e:
+                print(f"Error prefetching avatar: {e}")
+            
+            # Load, update, and save user data under the shared file lock
+            def store_verification(user_data):
+                user_data[user_id] = user_data.get(user_id, {})
+                user_data[user_id]["verification"] = verification
+            
+            await asyncio.to_thread(update_json, Config.USER_DATA_FILE, store_verification)
+            # Drop the host avatar cached for event embeds, it may belong to the old account
+            military = interaction.client.get_cog("MilitaryCommands")
+            if military:
+                military.host_avatars.pop(user_id, None)
         except Exception as e:
             print(f"Error saving verification data: {e}")
         
@@ -175,16 +262,11 @@ class VerificationCommands(commands.Cog):
     
     def load_user_data(self):
         """Load user data from JSON file"""
-        try:
-            with open(Config.USER_DATA_FILE, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        return load_json(Config.USER_DATA_FILE)
     
     def save_user_data(self, data):
         """Save user data to JSON file"""
-        with open(Config.USER_DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_json(Config.USER_DATA_FILE, data)
     
     def generate_verification_code(self):
         """Generate a random verification code"""
@@ -192,6 +274,7 @@ class VerificationCommands(commands.Cog):
     
     @app_commands.command(name="verify", description="Start the verification process to link your Roblox account")
     @app_commands.describe(roblox_username="Your Roblox username")
+    @throttled("verify")
     async def verify(self, interaction: discord.Interaction, roblox_username: str):
         """Handle verification command"""
         user_id = str(interaction.user.id)
@@ -261,6 +344,7 @@ class VerificationCommands(commands.Cog):
     
     @app_commands.command(name="reverify", description="Re-verify your Roblox account (updates rank)")
     @app_commands.describe(roblox_username="Your Roblox username")
+    @throttled("verify")
     async def reverify(self, interaction: discord.Interaction, roblox_username: str):
         """Handle reverification command"""
         
@@ -7,22 +7,91 @@ class Config:
     DISCORD_TOKEN = os.getenv('DISCORD_TOKEN', '')
     
     # Roblox group settings
-    ROBLOX_GROUP_ID = 11925205  # Convert to int for API
+    ROBLOX_GROUP_ID = 11925205  # Main group, membership is required to verify
+    ROBLOX_SUBGROUP_IDS = [int(g) for g in os.getenv('ROBLOX_SUBGROUP_IDS', '').split(',') if g.strip()]  # Regiment groups
+    # Group whose rank decides the nickname: the first one in this list the user belongs to
+    ROBLOX_NICKNAME_PRECEDENCE = [
+        int(g) for g in os.getenv('ROBLOX_NICKNAME_PRECEDENCE', '').split(',') if g.strip()
+    ] or ROBLOX_SUBGROUP_IDS + [ROBLOX_GROUP_ID]
     ROBLOX_COOKIE = os.getenv('ROBLOX_COOKIE', '')
+    ROBLOX_WORKERS = int(os.getenv('ROBLOX_WORKERS', '0'))  # >0 runs Roblox calls in worker processes
+    ROBLOX_WORKER_TIMEOUT = 15  # Seconds to wait for a worker result
+    # API base URLs, override to run against the local stand-in (utils/roblox_standin.py)
+    ROBLOX_GROUPS_URL = os.getenv('ROBLOX_GROUPS_URL', 'https://groups.roblox.com/v1')
+    ROBLOX_USERS_URL = os.getenv('ROBLOX_USERS_URL', 'https://users.roblox.com/v1')
+    ROBLOX_THUMBNAILS_URL = os.getenv('ROBLOX_THUMBNAILS_URL', 'https://thumbnails.roblox.com/v1')
+    ROBLOX_REQUEST_TIMEOUT = float(os.getenv('ROBLOX_REQUEST_TIMEOUT', '8'))  # Per-request timeout in seconds
+    ROBLOX_BREAKER_FAILURE_RATE = 0.5  # Failure rate that opens the circuit breaker
+    ROBLOX_BREAKER_MIN_REQUESTS = 5  # Requests in the window before the rate is trusted
+    ROBLOX_BREAKER_WINDOW = 60  # Seconds of request outcomes considered
+    ROBLOX_BREAKER_OPEN_SECONDS = 30  # How long to fail fast before probing Roblox again
+    ROBLOX_RECOVERY_WAIT = 600  # Seconds a verification waits for Roblox to recover
     
     # Bot settings
     COMMAND_PREFIX = "!"
+    COMMAND_SYNC_CONCURRENCY = 5  # Parallel guild syncs
+    ROLE_SYNC_RATE = 2.0  # Member edits per second for rank role sync
+    BULK_REVERIFY_CHUNK = 100  # Members resolved and re-ranked per batch
+    BULK_ROBLOX_CONCURRENCY = 10  # Parallel Roblox rank lookups during a bulk reverify
+    BULK_PROGRESS_INTERVAL = 5  # Seconds between progress message edits
+    THROTTLE_MAX_BUCKETS = 10000  # Token buckets kept in memory (least recently used are dropped)
+    # Token buckets per action: (capacity, seconds to refill completely) per user and per guild
+    THROTTLE_LIMITS = {
+        "verify": {"user": (3, 300), "guild": (30, 60)},
+        "verify_button": {"user": (3, 120), "guild": (20, 60)},
+        "ticket_open": {"user": (2, 300), "guild": (20, 60)},
+    }
+    SHUTDOWN_DRAIN_TIMEOUT = 20  # Seconds to let in-flight interactions finish on SIGTERM
+    
+    # Monitoring settings
+    HEALTH_MAX_LOOP_LAG = 1.0  # Worst event loop lag over the last minute before /health reports unhealthy
+    LOOP_MONITOR_INTERVAL = 0.25  # How often the loop lag sampler wakes up (seconds)
+    LOOP_STALL_THRESHOLD = 0.5  # Blocking longer than this is logged with a stack sample
+    TRACE_BUFFER_SIZE = 200  # Recent interaction traces kept in memory
+    TRACE_FILE = os.getenv('TRACE_FILE', '')  # Optional JSONL export of finished traces
+    PROFILE_MAX_SECONDS = 120
+    PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+    
+    # Sharding settings
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None  # None lets Discord recommend a count
+    CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', '1'))  # Worker processes sharing the shards
+    CLUSTER_ID = int(os.environ['CLUSTER_ID']) if os.getenv('CLUSTER_ID') else None  # Set by the launcher
     
     # File paths
     USER_DATA_FILE = "data/users.json"
+    TICKETS_FILE = "data/tickets.json"
+    TICKET_STATS_FILE = "data/ticket_stats.json" if CLUSTER_ID is None else f"data/ticket_stats.cluster{CLUSTER_ID}.json"
+    STATS_MESSAGES_FILE = "data/stats_messages.json"
+    GUILD_CONFIG_FILE = "data/guild_config.json"
+    COMMAND_SYNC_FILE = "data/command_sync.json"
+    RANK_TABLES_FILE = "data/rank_tables.json"  # Per-guild/group rank mappings, reloaded on change
+    RANK_TABLES_CHECK_INTERVAL = 30  # Seconds between checks of the rank tables file for changes
     
     # Verification settings
     VERIFICATION_CODE_LENGTH = 8
     VERIFICATION_TIMEOUT = 300  # 5 minutes
     
+    # Ticket settings
+    SUPPORT_ROLE_ID = 1385451612650344523
+    DEFAULT_TICKET_CHANNEL_ID = 1384585517730893864  # Used when a guild has no ticket channel configured
+    TICKET_STATS_SAVE_INTERVAL = 30  # Seconds between writes of changed ticket statistics
+    
+    # Server statistics settings
+    DEFAULT_STATS_CHANNEL_ID = 1384582591516119151  # Used when a guild has no stats channel configured
+    STATS_REFRESH_WINDOW = 300  # Updates are spread across this window (seconds)
+    STATS_MIN_INTERVAL = 60
+    STATS_MAX_INTERVAL = 900
+    
     # Military settings
     MAX_PAD_NUMBER = 9
     MIN_PAD_NUMBER = 1
+    TRYOUT_TYPES = ["Infantry", "Armor", "Aviation", "Artillery", "Engineers", "Medical", "Military Police", "Special Forces"]
+    TRAINING_TYPES = ["Combat", "Tactical", "Physical", "Marksmanship", "Drill", "Leadership", "First Aid"]
+    AVATAR_CACHE_TTL = 86400  # Seconds before a stored Roblox avatar URL is refreshed
+    AVATAR_REFRESH_INTERVAL = 3600  # How often stale avatars are refreshed in batches
+    EVENT_DEFAULT_DURATION = 60  # Minutes a pad stays booked when no duration is given
+    EVENT_REMINDER_LEAD_MINUTES = [15]  # Reminder pings before a tryout/training starts
+    EVENT_REMINDER_GRACE = 300  # Still send reminders this many seconds late (e.g. after a restart)
     
     # Colors for embeds
     COLORS = {
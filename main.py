@@ -1,20 +1,48 @@
+from utils.startup import startup_timer
 import discord
 from discord.ext import commands
 import asyncio
 import logging
+import math
 import os
+from datetime import datetime, timezone
 from aiohttp import web
 from config import Config
 from commands.military import MilitaryCommands
 from commands.verification import VerificationCommands
 from commands.tickets import TicketCommands
+from commands.admin import AdminCommands
+from utils.command_sync import CommandSyncManager
+from utils.metrics import REGISTRY, COMMAND_DURATION, GATEWAY_LATENCY
+from utils.loop_monitor import LoopMonitor
+from utils.tracing import tracer
+from utils.profiler import command_profiler
+from utils.cluster import ClusterLauncher, cluster_port, fetch_gateway_bot
+from utils.roblox_worker import RobloxWorkerPool, set_worker_pool
+from utils.shutdown import shutdown, add_signal_handlers
+from utils.role_sync import RoleSyncQueue
+from utils.throttle import Throttled, throttle_message
+from utils.circuit_breaker import roblox_breaker
+
+startup_timer.record("imports", startup_timer.elapsed())
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class MilitaryBot(commands.Bot):
-    def __init__(self):
+class BotCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Runs before every application command"""
+        if not await shutdown.admit(interaction):
+            return False
+        if interaction.command:
+            # Starts cProfile if an admin armed it for this command
+            command_profiler.start(interaction.command.qualified_name, interaction.id)
+        return True
+
+class MilitaryBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, cluster_id=None):
+        self.cluster_id = cluster_id
         intents = discord.Intents.default()
         intents.guilds = True
         # Note: Without privileged intents, member status data is limited
@@ -23,47 +51,60 @@ class MilitaryBot(commands.Bot):
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            tree_cls=BotCommandTree,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
         
+        GATEWAY_LATENCY.set_function(lambda: self.latency)
+        self.loop_monitor = LoopMonitor(
+            interval=Config.LOOP_MONITOR_INTERVAL,
+            threshold=Config.LOOP_STALL_THRESHOLD
+        )
+        self.roblox_pool = None
+        self.role_sync = RoleSyncQueue(rate=Config.ROLE_SYNC_RATE)
+        self.startup_task = None
+        
     async def setup_hook(self):
         """Called when the bot is starting up"""
-        # Add cogs
-        await self.add_cog(MilitaryCommands(self))
-        await self.add_cog(VerificationCommands(self))
-        await self.add_cog(TicketCommands(self))
+        # Watch for handlers that block the event loop
+        self.loop_monitor.start()
+        tracer.configure(buffer_size=Config.TRACE_BUFFER_SIZE, export_path=Config.TRACE_FILE)
         
-        # Sync slash commands globally and to guilds
-        try:
-            # Global sync (takes up to 1 hour to propagate)
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} command(s) globally")
-            
-            # Guild-specific sync for immediate availability
-            for guild in self.guilds:
-                try:
-                    guild_synced = await self.tree.sync(guild=guild)
-                    logger.info(f"Synced {len(guild_synced)} command(s) to guild: {guild.name}")
-                except Exception as guild_error:
-                    logger.error(f"Failed to sync commands to guild {guild.name}: {guild_error}")
-                    
-            for command in synced:
-                logger.info(f"  - {command.name}: {command.description}")
-        except Exception as e:
-            logger.error(f"Failed to sync commands: {e}")
+        # Optionally move Roblox HTTP and JSON work out of the gateway process
+        if Config.ROBLOX_WORKERS > 0:
+            self.roblox_pool = RobloxWorkerPool(
+                Config.ROBLOX_COOKIE,
+                workers=Config.ROBLOX_WORKERS,
+                timeout=Config.ROBLOX_WORKER_TIMEOUT
+            )
+            self.roblox_pool.start()
+            set_worker_pool(self.roblox_pool)
+        
+        # Rank role edits from verification and background jobs share one rate-limited queue
+        self.role_sync.start()
+        
+        # Add cogs (constructors stay cheap, storage is loaded after ready)
+        with startup_timer.phase("cog_init"):
+            await self.add_cog(MilitaryCommands(self))
+            await self.add_cog(VerificationCommands(self))
+            await self.add_cog(TicketCommands(self))
+            await self.add_cog(AdminCommands(self))
+        
+        self.tree.error(self.on_app_command_error)
+        self.command_sync = CommandSyncManager(self.tree, Config.COMMAND_SYNC_FILE, concurrency=Config.COMMAND_SYNC_CONCURRENCY)
+        startup_timer.mark("connecting")
     
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'{self.user} has landed on the battlefield!')
-        logger.info(f'Bot is in {len(self.guilds)} servers')
+        logger.info(f'Bot is in {len(self.guilds)} servers on shards {sorted(self.shards)}')
         
-        # Sync commands to all connected guilds for immediate availability
-        for guild in self.guilds:
-            try:
-                guild_synced = await self.tree.sync(guild=guild)
-                logger.info(f"Synced {len(guild_synced)} command(s) to guild: {guild.name}")
-            except Exception as guild_error:
-                logger.error(f"Failed to sync commands to guild {guild.name}: {guild_error}")
+        # Non-critical startup work runs in the background once we're online
+        if self.startup_task is None:
+            startup_timer.record("gateway_ready", startup_timer.since("connecting") or 0.0)
+            self.startup_task = asyncio.create_task(self.finish_startup())
         
         # Set bot status
         activity = discord.Activity(
@@ -72,6 +113,89 @@ class MilitaryBot(commands.Bot):
         )
         await self.change_presence(activity=activity)
     
+    async def finish_startup(self):
+        """Deferred startup: storage warm-up, background loops and command sync"""
+        with startup_timer.phase("storage_warm_up"):
+            for cog in list(self.cogs.values()):
+                warm_up = getattr(cog, "warm_up", None)
+                if warm_up is None:
+                    continue
+                try:
+                    await warm_up()
+                except Exception as e:
+                    logger.error(f"Failed to warm up {cog.qualified_name}: {e}")
+        
+        # Sync slash commands, skipped for scopes whose command tree is unchanged
+        with startup_timer.phase("command_sync"):
+            try:
+                # Global sync (takes up to 1 hour to propagate), done by the first cluster only
+                if not self.cluster_id:
+                    synced = await self.command_sync.sync()
+                    if synced is not None:
+                        for command in synced:
+                            logger.info(f"  - {command.name}: {command.description}")
+                await self.command_sync.sync_guilds(self.guilds)
+            except Exception as e:
+                logger.error(f"Failed to sync commands: {e}")
+        
+        startup_timer.log_report()
+    
+    async def graceful_shutdown(self):
+        """SIGTERM handler: refuse new interactions, drain in-flight work, flush data and disconnect"""
+        if shutdown.draining:
+            return
+        logger.info("Shutdown requested, draining before disconnect")
+        shutdown.start_draining()
+        if self.startup_task and not self.startup_task.done():
+            self.startup_task.cancel()
+        
+        await shutdown.drain(Config.SHUTDOWN_DRAIN_TIMEOUT)
+        await self.role_sync.drain(Config.SHUTDOWN_DRAIN_TIMEOUT)
+        
+        # Persist anything cogs still hold in memory
+        for cog in list(self.cogs.values()):
+            flush = getattr(cog, "flush", None)
+            if flush is None:
+                continue
+            try:
+                flush()
+            except Exception as e:
+                logger.error(f"Failed to flush {cog.qualified_name}: {e}")
+        
+        await self.close()
+    
+    async def close(self):
+        """Stop background monitors and disconnect"""
+        self.loop_monitor.stop()
+        self.role_sync.stop()
+        if self.roblox_pool:
+            set_worker_pool(None)
+            await self.roblox_pool.close()
+        await super().close()
+    
+    def record_command_duration(self, interaction: discord.Interaction, status: str):
+        """Record latency from interaction creation to command completion"""
+        command_name = interaction.command.qualified_name if interaction.command else "unknown"
+        elapsed = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+        COMMAND_DURATION.observe(elapsed, command=command_name, status=status)
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Called when an application command finishes successfully"""
+        command_profiler.stop(interaction.id)
+        self.record_command_duration(interaction, "ok")
+    
+    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        """Error handler for application commands"""
+        command_profiler.stop(interaction.id)
+        if isinstance(error, Throttled):
+            self.record_command_duration(interaction, "throttled")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(throttle_message(error.retry_after), ephemeral=True)
+            return
+        self.record_command_duration(interaction, "error")
+        command_name = interaction.command.qualified_name if interaction.command else "unknown"
+        logger.error(f"Error in command {command_name}: {error}", exc_info=error)
+    
     async def on_command_error(self, ctx, error):
         """Global error handler"""
         if isinstance(error, commands.CommandNotFound):
@@ -82,26 +206,73 @@ class MilitaryBot(commands.Bot):
             logger.error(f"Unexpected error: {error}")
             await ctx.send("❌ An unexpected error occurred!")
 
+async def liveness_check(request):
+    """Liveness endpoint for hosting platforms (the process is up)"""
+    return web.json_response({"status": "alive"})
+
 async def health_check(request):
-    """Health check endpoint for hosting platforms"""
-    return web.json_response({"status": "healthy", "bot": "online"})
+    """Readiness check: gateway connected and event loop responsive"""
+    bot = request.app['bot']
+    
+    shards = {
+        str(shard_id): {
+            "connected": not shard.is_closed(),
+            "latency": shard.latency if math.isfinite(shard.latency) else None,
+            "ratelimited": shard.is_ws_ratelimited()
+        }
+        for shard_id, shard in bot.shards.items()
+    }
+    
+    gateway_connected = bot.is_ready() and not bot.is_closed() and all(s["connected"] for s in shards.values())
+    # A sleep(0) round trip only sees the queue right now; the monitor has seen the last 60s
+    loop_responsive = bot.loop_monitor.recent_max_lag < Config.HEALTH_MAX_LOOP_LAG
+    healthy = gateway_connected and loop_responsive and not shutdown.draining
+    # A Roblox outage degrades verification but restarting the bot wouldn't help, so stay ready
+    roblox = roblox_breaker.snapshot()
+    degraded = roblox["state"] != "closed"
+    
+    return web.json_response(
+        {
+            "status": ("degraded" if degraded else "healthy") if healthy else "unhealthy",
+            "bot": "online" if gateway_connected else "offline",
+            "gateway_latency": bot.latency if math.isfinite(bot.latency) else None,
+            "loop_lag": bot.loop_monitor.last_lag,
+            "loop_lag_max_60s": bot.loop_monitor.recent_max_lag,
+            "loop_responsive": loop_responsive,
+            "draining": shutdown.draining,
+            "roblox": roblox,
+            "cluster": bot.cluster_id,
+            "shard_count": bot.shard_count,
+            "shards": shards
+        },
+        status=200 if healthy else 503
+    )
 
-async def start_web_server():
-    """Start a simple web server for hosting platform health checks"""
+async def metrics_endpoint(request):
+    """Prometheus text exposition of bot metrics"""
+    return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+
+async def start_web_server(bot, port=None):
+    """Start the web server for health checks and metrics"""
     app = web.Application()
-    app.router.add_get('/', health_check)
+    app['bot'] = bot
+    app.router.add_get('/', liveness_check)
     app.router.add_get('/health', health_check)
+    app.router.add_get('/metrics', metrics_endpoint)
     
-    port = int(os.environ.get('PORT', 10000))
+    port = port or int(os.environ.get('PORT', 10000))
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, '0.0.0.0', port)
     await site.start()
     logger.info(f"Health check server started on port {port}")
 
-async def main():
-    """Main function to run the bot"""
-    bot = MilitaryBot()
+async def main(shard_ids=None, shard_count=None, cluster_id=None):
+    """Main function to run the bot (optionally as one cluster of shards)"""
+    bot = MilitaryBot(shard_ids=shard_ids, shard_count=shard_count, cluster_id=cluster_id)
+    port = None
+    if cluster_id is not None:
+        port = cluster_port(int(os.environ.get('PORT', 10000)), cluster_id)
     
     # Get token from environment
     token = os.getenv('DISCORD_TOKEN')
@@ -109,10 +280,13 @@ async def main():
         logger.error("DISCORD_TOKEN environment variable not found!")
         return
     
+    # Drain and flush on SIGTERM (rolling redeploys) instead of dying mid-write
+    add_signal_handlers(lambda sig: asyncio.create_task(bot.graceful_shutdown()))
+    
     try:
         # Start both web server and bot concurrently
         await asyncio.gather(
-            start_web_server(),
+            start_web_server(bot, port),
             bot.start(token)
         )
     except discord.LoginFailure:
@@ -123,5 +297,32 @@ async def main():
         if not bot.is_closed():
             await bot.close()
 
+def run_cluster(cluster_id, shard_ids, shard_count):
+    """Process entry point for one cluster"""
+    asyncio.run(main(shard_ids=shard_ids, shard_count=shard_count, cluster_id=cluster_id))
+
+async def launch_clusters():
+    """Spread the shards over Config.CLUSTER_COUNT worker processes"""
+    token = os.getenv('DISCORD_TOKEN')
+    if not token:
+        logger.error("DISCORD_TOKEN environment variable not found!")
+        return
+    
+    gateway = await fetch_gateway_bot(token)
+    shard_count = Config.SHARD_COUNT or int(gateway["shards"])
+    max_concurrency = int(gateway.get("session_start_limit", {}).get("max_concurrency", 1))
+    logger.info(f"Launching {shard_count} shard(s) across {Config.CLUSTER_COUNT} cluster(s)")
+    launcher = ClusterLauncher(
+        run_cluster,
+        shard_count=shard_count,
+        cluster_count=Config.CLUSTER_COUNT,
+        base_port=int(os.environ.get('PORT', 10000)),
+        max_concurrency=max_concurrency
+    )
+    await launcher.run()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if Config.CLUSTER_COUNT > 1:
+        asyncio.run(launch_clusters())
+    else:
+        asyncio.run(main(shard_count=Config.SHARD_COUNT))
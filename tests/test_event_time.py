@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from utils.event_time import parse_event_time
+
+# A Monday
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def test_relative_overflow_returns_none():
+    assert parse_event_time("in 99999999 days", NOW) is None
+
+
+def test_timestamp_out_of_range_returns_none():
+    assert parse_event_time("<t:99999999999999>", NOW) is None
+
+
+def test_timestamp():
+    assert parse_event_time("<t:1800000000:F>", NOW) == datetime.fromtimestamp(1800000000, timezone.utc)
+
+
+def test_relative():
+    assert parse_event_time("in 2 hours", NOW) == datetime(2026, 10, 19, 14, 0, tzinfo=timezone.utc)
+
+
+def test_same_day_weekday_already_passed_is_next_week():
+    assert parse_event_time("monday 11am", NOW) == datetime(2026, 10, 26, 11, 0, tzinfo=timezone.utc)
+
+
+def test_same_day_weekday_later_today():
+    assert parse_event_time("monday 1pm", NOW) == datetime(2026, 10, 19, 13, 0, tzinfo=timezone.utc)
+
+
+def test_today_keeps_the_same_day():
+    assert parse_event_time("today 11am", NOW) == datetime(2026, 10, 19, 11, 0, tzinfo=timezone.utc)
+    assert parse_event_time("tonight 9pm", NOW) == datetime(2026, 10, 19, 21, 0, tzinfo=timezone.utc)
@@ -0,0 +1,152 @@
+"""
+Circuit breaker for outbound APIs: fail fast while a dependency is down
+"""
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Dict
+
+from config import Config
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_STATE = REGISTRY.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    labels=("breaker",)
+)
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Opens when the failure rate over a sliding window crosses a threshold
+
+    While open, requests are refused immediately. After `open_seconds` the
+    breaker goes half-open and lets one probe request through: success closes
+    it, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_requests: int = 5,
+                 window: float = 60, open_seconds: float = 30):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_seconds = open_seconds
+        self.results = collections.deque()  # (time, ok)
+        self.opened_at = 0.0
+        self._state = CLOSED
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self._changed = asyncio.Event()
+        BREAKER_STATE.set(0, breaker=name)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker {self.name}: {self._state} -> {state}")
+        self._state = state
+        BREAKER_STATE.set(STATE_VALUES[state], breaker=self.name)
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == CLOSED:
+            self.results.clear()
+        self.probe_in_flight = False
+        self._changed.set()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may go out now"""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def release_probe(self):
+        """Give up a half-open probe that ended without a result (e.g. cancelled)"""
+        if self._state == HALF_OPEN:
+            self.probe_in_flight = False
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        if self._state == HALF_OPEN:
+            self._transition(CLOSED if ok else OPEN)
+            return
+        self.results.append((now, ok))
+        while self.results and self.results[0][0] < now - self.window:
+            self.results.popleft()
+        if self._state == CLOSED and len(self.results) >= self.min_requests:
+            failures = sum(1 for _, result in self.results if not result)
+            if failures / len(self.results) >= self.failure_rate:
+                self._transition(OPEN)
+
+    @property
+    def available(self) -> bool:
+        """True when a request would currently be allowed"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self.probe_in_flight)
+
+    async def wait_until_available(self, timeout: float) -> bool:
+        """Wait for the breaker to close or offer a probe, False on timeout
+        
+        Every waiter wakes when the probe slot opens but only one gets it; the
+        others are refused with CircuitOpenError and should wait again.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.available:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._changed.clear()
+            # Wake on state changes, and when the open period ends (half-open is evaluated lazily)
+            wait = min(remaining, self.retry_after() or 1.0)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=max(wait, 0.05))
+            except asyncio.TimeoutError:
+                pass
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        failures = sum(1 for _, ok in self.results if not ok)
+        return {
+            "state": state,
+            "recent_requests": len(self.results),
+            "recent_failures": failures,
+            "retry_after": round(self.retry_after(), 1) if state == OPEN else 0,
+            "times_opened": self.times_opened
+        }
+
+
+roblox_breaker = CircuitBreaker(
+    "roblox",
+    failure_rate=Config.ROBLOX_BREAKER_FAILURE_RATE,
+    min_requests=Config.ROBLOX_BREAKER_MIN_REQUESTS,
+    window=Config.ROBLOX_BREAKER_WINDOW,
+    open_seconds=Config.ROBLOX_BREAKER_OPEN_SECONDS
+)
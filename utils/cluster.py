@@ -0,0 +1,173 @@
+"""
+Multi-process cluster launcher for the auto-sharded bot
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from utils.shutdown import add_signal_handlers
+
+logger = logging.getLogger(__name__)
+
+DISCORD_API = "https://discord.com/api/v10"
+
+
+# Discord allows `max_concurrency` IDENTIFYs per 5 second window
+IDENTIFY_WINDOW = 5
+
+
+async def fetch_gateway_bot(token: str) -> dict:
+    """Ask Discord for the recommended shard count and session start limits"""
+    async with aiohttp.ClientSession(headers={"Authorization": f"Bot {token}"}) as session:
+        async with session.get(f"{DISCORD_API}/gateway/bot") as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard IDs into contiguous ranges, one per cluster"""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    ranges = []
+    start = 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def cluster_port(base_port: int, cluster_id: int) -> int:
+    """Port of a cluster's own health/metrics server (the launcher keeps the base port)"""
+    return base_port + 1 + cluster_id
+
+
+class ClusterLauncher:
+    """Starts one worker process per shard range, restarts crashed workers,
+    and serves an aggregated /health on the base port
+
+    Each bot only paces IDENTIFY within its own process, so clusters are
+    started one after another, each given time to identify all its shards.
+    """
+
+    def __init__(self, entry: Callable[[int, List[int], int], None], shard_count: int, cluster_count: int, base_port: int,
+                 max_concurrency: int = 1):
+        self.entry = entry
+        self.max_concurrency = max(1, max_concurrency)
+        self.shard_count = shard_count
+        self.shard_ranges = split_shards(shard_count, cluster_count)
+        self.base_port = base_port
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.restarts: Dict[int, int] = {}
+        self.stopping = False
+
+    def start_cluster(self, cluster_id: int):
+        shard_ids = self.shard_ranges[cluster_id]
+        # Spawned children read their cluster ID from the environment at import time
+        os.environ["CLUSTER_ID"] = str(cluster_id)
+        process = self.context.Process(
+            target=self.entry,
+            args=(cluster_id, shard_ids, self.shard_count),
+            name=f"cluster-{cluster_id}",
+            daemon=False
+        )
+        process.start()
+        self.processes[cluster_id] = process
+        logger.info(f"Started cluster {cluster_id} (pid {process.pid}) with shards {shard_ids[0]}-{shard_ids[-1]}")
+
+    async def supervise(self):
+        """Restart clusters that exit unexpectedly, with backoff"""
+        while not self.stopping:
+            await asyncio.sleep(5)
+            for cluster_id, process in list(self.processes.items()):
+                if process.is_alive() or self.stopping:
+                    continue
+                self.restarts[cluster_id] = self.restarts.get(cluster_id, 0) + 1
+                delay = min(60, 2 ** self.restarts[cluster_id])
+                logger.error(f"Cluster {cluster_id} exited with code {process.exitcode}, restarting in {delay}s")
+                await asyncio.sleep(delay)
+                if not self.stopping:
+                    self.start_cluster(cluster_id)
+
+    async def health(self, request):
+        """Aggregate each cluster's /health into one response"""
+        clusters = {}
+        healthy = True
+        timeout = aiohttp.ClientTimeout(total=3)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for cluster_id, process in self.processes.items():
+                entry = {"pid": process.pid, "alive": process.is_alive(), "restarts": self.restarts.get(cluster_id, 0)}
+                try:
+                    async with session.get(f"http://127.0.0.1:{cluster_port(self.base_port, cluster_id)}/health") as response:
+                        entry.update(await response.json())
+                        entry["http_status"] = response.status
+                        healthy = healthy and response.status == 200
+                except Exception as e:
+                    entry["error"] = str(e)
+                    healthy = False
+                clusters[str(cluster_id)] = entry
+        return web.json_response(
+            {"status": "healthy" if healthy else "unhealthy", "shard_count": self.shard_count, "clusters": clusters},
+            status=200 if healthy else 503
+        )
+
+    async def liveness(self, request):
+        return web.json_response({"status": "alive", "clusters": len(self.processes)})
+
+    def stop(self, sig=signal.SIGTERM):
+        """Forward a shutdown signal to every cluster"""
+        self.stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, sig)
+
+    def identify_time(self, cluster_id: int) -> float:
+        """Seconds a cluster needs to IDENTIFY all its shards"""
+        return math.ceil(len(self.shard_ranges[cluster_id]) / self.max_concurrency) * IDENTIFY_WINDOW
+
+    async def start_all(self):
+        for cluster_id in range(len(self.shard_ranges)):
+            if self.stopping:
+                return
+            self.start_cluster(cluster_id)
+            if cluster_id < len(self.shard_ranges) - 1:
+                await asyncio.sleep(self.identify_time(cluster_id))
+
+    async def run(self):
+        starter = asyncio.create_task(self.start_all())
+
+        app = web.Application()
+        app.router.add_get('/', self.liveness)
+        app.router.add_get('/health', self.health)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '0.0.0.0', self.base_port).start()
+        logger.info(f"Cluster health server started on port {self.base_port}")
+
+        loop = asyncio.get_running_loop()
+        add_signal_handlers(self.stop)
+
+        supervisor = asyncio.create_task(self.supervise())
+        try:
+            while not self.stopping:
+                await asyncio.sleep(1)
+            # Give clusters time to drain and exit on their own
+            await loop.run_in_executor(None, self.join_all)
+        finally:
+            starter.cancel()
+            supervisor.cancel()
+            await runner.cleanup()
+
+    def join_all(self, timeout: Optional[float] = 60):
+        for process in self.processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,83 @@
+"""
+Hash-gated application command sync
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import discord
+from discord import app_commands
+
+from utils.metrics import CACHE_REQUESTS
+from utils.storage import load_json, update_json
+
+logger = logging.getLogger(__name__)
+
+
+class CommandSyncManager:
+    """Only calls `tree.sync` for scopes whose serialized commands changed
+
+    The hash of the serialized command payload is stored per scope ("global"
+    or a guild ID) after a successful sync, so reconnects and redeploys with
+    an unchanged command tree don't spend any REST calls.
+    """
+
+    def __init__(self, tree: app_commands.CommandTree, path: str, concurrency: int = 5):
+        self.tree = tree
+        self.path = path
+        self.concurrency = concurrency
+        self.hashes: Dict[str, str] = self.load()
+
+    def load(self) -> Dict[str, str]:
+        """Load last-synced hashes from JSON file"""
+        return load_json(self.path)
+
+    def save(self, scope: str):
+        """Save one scope's last-synced hash, keeping other processes' scopes"""
+        digest = self.hashes[scope]
+
+        def apply(hashes):
+            hashes[scope] = digest
+
+        self.hashes = update_json(self.path, apply)
+
+    def tree_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        """Hash the command payload that would be sent for a scope"""
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+            key=lambda command: (command.get("type", 1), command["name"])
+        )
+        application_id = self.tree.client.application_id
+        data = json.dumps({"application_id": application_id, "commands": payload}, sort_keys=True)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    async def sync(self, guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> Optional[List[app_commands.AppCommand]]:
+        """Sync one scope, returns the synced commands or None if it was unchanged"""
+        scope = str(guild.id) if guild else "global"
+        digest = self.tree_hash(guild)
+        if not force and self.hashes.get(scope) == digest:
+            CACHE_REQUESTS.inc(cache="command_sync", result="hit")
+            logger.info(f"Commands unchanged for scope {scope}, skipping sync")
+            return None
+
+        CACHE_REQUESTS.inc(cache="command_sync", result="miss")
+        synced = await self.tree.sync(guild=guild)
+        self.hashes[scope] = digest
+        await asyncio.to_thread(self.save, scope)
+        logger.info(f"Synced {len(synced)} command(s) to scope {scope}")
+        return synced
+
+    async def sync_guilds(self, guilds: Iterable[discord.Guild], force: bool = False):
+        """Sync many guild scopes concurrently under a limiter"""
+        limiter = asyncio.Semaphore(self.concurrency)
+
+        async def sync_one(guild: discord.Guild):
+            async with limiter:
+                try:
+                    await self.sync(guild=guild, force=force)
+                except Exception as guild_error:
+                    logger.error(f"Failed to sync commands to guild {guild.name}: {guild_error}")
+
+        await asyncio.gather(*(sync_one(guild) for guild in guilds))
@@ -0,0 +1,41 @@
+"""
+Time-ordered index of scheduled events per guild, read one page at a time
+"""
+import bisect
+from typing import Any, Dict, List, Tuple
+
+
+class EventIndex:
+    """Events of each guild sorted by start time, with summaries kept by event ID"""
+
+    def __init__(self):
+        self.guilds: Dict[int, List[Tuple[float, str]]] = {}
+        self.events: Dict[str, Dict[str, Any]] = {}
+
+    def clear(self):
+        self.guilds.clear()
+        self.events.clear()
+
+    def add(self, guild_id: int, start: float, event_id: str, summary: Dict[str, Any]):
+        if event_id in self.events:
+            return
+        self.events[event_id] = summary
+        bisect.insort(self.guilds.setdefault(guild_id, []), (start, event_id))
+
+    def remove(self, guild_id: int, start: float, event_id: str):
+        if self.events.pop(event_id, None) is None:
+            return
+        entries = self.guilds.get(guild_id, [])
+        index = bisect.bisect_left(entries, (start, event_id))
+        if index < len(entries) and entries[index] == (start, event_id):
+            del entries[index]
+
+    def count_after(self, guild_id: int, after: float) -> int:
+        entries = self.guilds.get(guild_id, [])
+        return len(entries) - bisect.bisect_left(entries, (after,))
+
+    def page(self, guild_id: int, after: float, offset: int, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Events starting at or after `after`, skipping `offset` of them"""
+        entries = self.guilds.get(guild_id, [])
+        first = bisect.bisect_left(entries, (after,)) + offset
+        return [(start, self.events[event_id]) for start, event_id in entries[first:first + limit]]
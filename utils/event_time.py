@@ -0,0 +1,144 @@
+"""
+Parsing of free-text event start times ("2pm EST", "in 30 minutes") into UTC
+"""
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# Common abbreviations; regional ones map to the zone so daylight saving is handled
+TIMEZONES = {
+    "utc": timezone.utc, "gmt": timezone.utc, "z": timezone.utc,
+    "est": ZoneInfo("America/New_York"), "edt": ZoneInfo("America/New_York"), "et": ZoneInfo("America/New_York"),
+    "cst": ZoneInfo("America/Chicago"), "cdt": ZoneInfo("America/Chicago"), "ct": ZoneInfo("America/Chicago"),
+    "mst": ZoneInfo("America/Denver"), "mdt": ZoneInfo("America/Denver"), "mt": ZoneInfo("America/Denver"),
+    "pst": ZoneInfo("America/Los_Angeles"), "pdt": ZoneInfo("America/Los_Angeles"), "pt": ZoneInfo("America/Los_Angeles"),
+    "bst": ZoneInfo("Europe/London"), "uk": ZoneInfo("Europe/London"),
+    "cet": ZoneInfo("Europe/Berlin"), "cest": ZoneInfo("Europe/Berlin"),
+    "aest": ZoneInfo("Australia/Sydney"), "aedt": ZoneInfo("Australia/Sydney"),
+}
+
+UNITS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400,
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+DISCORD_TIMESTAMP = re.compile(r"<t:(-?\d+)(?::[tTdDfFR])?>")
+RELATIVE = re.compile(r"^(?:in\s+)?((?:\d+(?:\.\d+)?\s*[a-z]+\s*(?:and\s+)?)+)(?:\s+from\s+now)?$")
+RELATIVE_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]+)")
+CLOCK = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b")
+OFFSET = re.compile(r"\b(?:utc|gmt)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?\b")
+
+
+def _extract_timezone(text: str) -> Tuple[str, Optional[tzinfo]]:
+    """Remove a timezone token from the text and return it"""
+    match = OFFSET.search(text)
+    if match:
+        sign = 1 if match.group(1) == "+" else -1
+        offset = timedelta(hours=int(match.group(2)), minutes=int(match.group(3) or 0))
+        return (text[:match.start()] + text[match.end():]).strip(), timezone(sign * offset)
+    for word in text.split():
+        zone = TIMEZONES.get(word.strip(".,()"))
+        if zone is not None:
+            return " ".join(w for w in text.split() if w != word).strip(), zone
+    return text, None
+
+
+def _parse_relative(text: str) -> Optional[timedelta]:
+    match = RELATIVE.match(text)
+    if not match:
+        return None
+    seconds = 0.0
+    for amount, unit in RELATIVE_PART.findall(match.group(1)):
+        if unit not in UNITS:
+            return None
+        seconds += float(amount) * UNITS[unit]
+    return timedelta(seconds=seconds)
+
+
+def parse_event_time(text: str, now: Optional[datetime] = None, default_tz: tzinfo = timezone.utc) -> Optional[datetime]:
+    """Parse a start time into an aware UTC datetime, None when it can't be understood
+
+    Understands relative times ("in 30 minutes", "1h30m", "now"), clock times
+    with an optional day and timezone ("2pm EST", "tomorrow 14:30 UTC",
+    "saturday 5pm GMT+1") and Discord timestamps ("<t:1700000000:F>").
+    A clock time without a day means its next occurrence.
+    """
+    now = now or datetime.now(timezone.utc)
+    raw = text.strip()
+
+    match = DISCORD_TIMESTAMP.search(raw)
+    if match:
+        try:
+            return datetime.fromtimestamp(int(match.group(1)), timezone.utc)
+        except (OverflowError, ValueError, OSError):
+            return None  # Outside the range datetime can represent
+
+    text = raw.lower().replace(",", " ")
+    text = re.sub(r"\s+", " ", text).strip()
+    if text in ("now", "right now", "asap"):
+        return now
+
+    try:
+        delta = _parse_relative(text)
+        if delta is not None:
+            return now + delta
+    except (OverflowError, ValueError, OSError):
+        return None
+
+    text, zone = _extract_timezone(text)
+    zone = zone or default_tz
+    local_now = now.astimezone(zone)
+
+    day_offset = None
+    weekday = False
+    if "tomorrow" in text:
+        day_offset = 1
+        text = text.replace("tomorrow", " ")
+    elif "today" in text or "tonight" in text:
+        day_offset = 0
+        text = text.replace("today", " ").replace("tonight", " ")
+    else:
+        for index, name in enumerate(WEEKDAYS):
+            if name in text or re.search(rf"\b{name[:3]}\b", text):
+                day_offset = (index - local_now.weekday()) % 7
+                weekday = True
+                text = re.sub(rf"\b{name}\b|\b{name[:3]}\b", " ", text)
+                break
+
+    text = re.sub(r"\b(at|on|@)\b", " ", text).strip()
+    clock = CLOCK.search(text)
+    if not clock or text.replace(clock.group(0), "").strip():
+        return None  # Missing a time, or leftover words we don't understand
+
+    hour, minute, meridiem = int(clock.group(1)), int(clock.group(2) or 0), clock.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif clock.group(2) is None:
+        return None  # A bare number like "5" is too ambiguous
+    if hour > 23 or minute > 59:
+        return None
+
+    candidate = datetime(local_now.year, local_now.month, local_now.day, hour, minute, tzinfo=zone)
+    if day_offset is not None:
+        candidate += timedelta(days=day_offset)
+        if weekday and candidate <= local_now:
+            candidate += timedelta(days=7)  # Today's weekday but the time has passed: next week
+        return candidate.astimezone(timezone.utc)
+    if candidate <= local_now:
+        candidate += timedelta(days=1)
+    return candidate.astimezone(timezone.utc)
+
+
+def format_event_time(starts: str, starts_at: Optional[str]) -> str:
+    """Display text for an event start, with a Discord timestamp when it was parsed"""
+    if not starts_at:
+        return starts
+    timestamp = int(datetime.fromisoformat(starts_at).timestamp())
+    return f"{starts} (<t:{timestamp}:F>, <t:{timestamp}:R>)"
@@ -0,0 +1,29 @@
+"""
+Per-guild settings (statistics and ticket channels)
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from utils.storage import load_json, update_json
+
+
+class GuildConfigStore:
+    """Small JSON-backed store of per-guild settings"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load guild settings from JSON file"""
+        return load_json(self.path)
+
+    def get(self, guild_id: int, key: str, default: Optional[Any] = None) -> Any:
+        return self.data.get(str(guild_id), {}).get(key, default)
+
+    async def set(self, guild_id: int, key: str, value: Any):
+        """Update one setting, merging with changes made by other processes (off the event loop)"""
+        def apply(data):
+            data.setdefault(str(guild_id), {})[key] = value
+
+        self.data = await asyncio.to_thread(update_json, self.path, apply)
@@ -0,0 +1,147 @@
+"""
+Event loop lag monitor and stall watchdog
+"""
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled loop wakeup and when it actually ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = REGISTRY.counter(
+    "event_loop_stalls_total", "Event loop stalls over the threshold by culprit function",
+    labels=("culprit",)
+)
+LOOP_STALL_DURATION = REGISTRY.histogram(
+    "event_loop_stall_duration_seconds", "Duration of event loop stalls by culprit function",
+    labels=("culprit",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+)
+
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename and not filename.endswith("loop_monitor.py")
+
+
+def find_culprit(frame) -> str:
+    """Name the innermost project function on a stack, e.g. 'commands/military.py:MilitaryCommands.tryout'"""
+    innermost = frame
+    while frame is not None:
+        code = frame.f_code
+        if _is_project_frame(code.co_filename):
+            relative = os.path.relpath(code.co_filename, PROJECT_ROOT)
+            return f"{relative}:{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    if innermost is None:
+        return "unknown"
+    # No project code on the stack, fall back to the innermost frame
+    code = innermost.f_code
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class LoopMonitor:
+    """Samples event loop lag and watches for stalls from a background thread
+
+    A coroutine on the loop records a heartbeat every `interval` seconds and
+    measures how late it woke up. A watchdog thread checks the heartbeat;
+    when it goes stale by more than `threshold`, the loop thread's stack is
+    sampled so the blocking function (and the task running it) can be
+    logged and exported as metrics.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.5, sample_interval: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.heartbeat = time.monotonic()
+        self.last_lag = 0.0
+        self.recent_lags = collections.deque(maxlen=int(60 / interval))
+        self.stalls = collections.deque(maxlen=50)
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def recent_max_lag(self) -> float:
+        return max(self.recent_lags, default=0.0)
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = self.loop.create_task(self._sampler())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _sampler(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.heartbeat = now
+            self.last_lag = lag
+            self.recent_lags.append(lag)
+            LOOP_LAG.observe(lag)
+
+    def _watchdog(self):
+        stall_started = None
+        culprits: Dict[str, int] = {}
+        stack = None
+        task_name = None
+
+        while not self._stop.wait(self.sample_interval):
+            stalled_for = time.monotonic() - self.heartbeat - self.interval
+            if stalled_for > self.threshold:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is None:
+                    continue
+                if stall_started is None:
+                    stall_started = self.heartbeat + self.interval
+                    task = asyncio.current_task(self.loop)
+                    task_name = task.get_name() if task else None
+                    stack = "".join(traceback.format_stack(frame))
+                culprit = find_culprit(frame)
+                culprits[culprit] = culprits.get(culprit, 0) + 1
+            elif stall_started is not None:
+                # Heartbeat resumed, report the stall once
+                duration = self.heartbeat - stall_started
+                culprit = max(culprits, key=culprits.get)
+                LOOP_STALLS.inc(culprit=culprit)
+                LOOP_STALL_DURATION.observe(duration, culprit=culprit)
+                self.stalls.append({
+                    "at": time.time(),
+                    "duration": duration,
+                    "culprit": culprit,
+                    "task": task_name,
+                    "samples": dict(culprits)
+                })
+                logger.warning(
+                    f"Event loop blocked for {duration:.2f}s in {culprit} (task: {task_name})\n"
+                    f"Stack at detection:\n{stack}"
+                )
+                stall_started = None
+                culprits = {}
+                stack = None
+                task_name = None
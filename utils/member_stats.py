@@ -0,0 +1,138 @@
+"""
+Incrementally maintained member statistics per guild
+"""
+import discord
+from typing import Dict, Any
+
+# Fraction of the member list we need to see before trusting real counts
+MIN_VISIBLE_RATIO = 0.1
+
+
+def _status_key(status) -> str:
+    """Bucket a member status into online/idle/dnd/offline"""
+    if status == discord.Status.online:
+        return "online"
+    elif status == discord.Status.idle:
+        return "idle"
+    elif status == discord.Status.dnd:
+        return "dnd"
+    return "offline"
+
+
+def _in_voice(state) -> bool:
+    return state is not None and isinstance(state.channel, discord.VoiceChannel)
+
+
+class GuildCounters:
+    """Member counters for a single guild"""
+
+    def __init__(self):
+        self.visible_members = 0
+        self.voice_members = 0
+        self.status_counts = {"online": 0, "idle": 0, "dnd": 0, "offline": 0}
+        self.events = 0
+
+    def seed(self, guild: discord.Guild):
+        """Initialise counters from the member cache (once per guild connect)"""
+        self.visible_members = 0
+        self.status_counts = {"online": 0, "idle": 0, "dnd": 0, "offline": 0}
+        for member in guild.members:
+            self.visible_members += 1
+            self.status_counts[_status_key(member.status)] += 1
+        self.voice_members = sum(len(channel.members) for channel in guild.voice_channels)
+
+
+class MemberStatsTracker:
+    """Keeps per-guild counters up to date from gateway events"""
+
+    def __init__(self):
+        self.guilds: Dict[int, GuildCounters] = {}
+
+    def seed(self, guild: discord.Guild):
+        counters = GuildCounters()
+        counters.seed(guild)
+        self.guilds[guild.id] = counters
+
+    def forget(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+
+    def take_events(self, guild_id: int) -> int:
+        """Return and reset the number of events seen since the last call"""
+        counters = self.guilds.get(guild_id)
+        if counters is None:
+            return 0
+        events, counters.events = counters.events, 0
+        return events
+
+    def _counters(self, guild: discord.Guild) -> GuildCounters:
+        counters = self.guilds.get(guild.id)
+        if counters is None:
+            self.seed(guild)
+            counters = self.guilds[guild.id]
+        return counters
+
+    def member_joined(self, member: discord.Member):
+        counters = self._counters(member.guild)
+        counters.visible_members += 1
+        counters.status_counts[_status_key(member.status)] += 1
+        counters.events += 1
+
+    def member_left(self, member: discord.Member):
+        counters = self._counters(member.guild)
+        counters.visible_members = max(0, counters.visible_members - 1)
+        key = _status_key(member.status)
+        counters.status_counts[key] = max(0, counters.status_counts[key] - 1)
+        if _in_voice(member.voice):
+            counters.voice_members = max(0, counters.voice_members - 1)
+        counters.events += 1
+
+    def voice_changed(self, member: discord.Member, before, after):
+        was_in_voice, is_in_voice = _in_voice(before), _in_voice(after)
+        if was_in_voice == is_in_voice:
+            return
+        counters = self._counters(member.guild)
+        counters.voice_members = max(0, counters.voice_members + (1 if is_in_voice else -1))
+        counters.events += 1
+
+    def presence_changed(self, before: discord.Member, after: discord.Member):
+        old_key, new_key = _status_key(before.status), _status_key(after.status)
+        if old_key == new_key:
+            return
+        counters = self._counters(after.guild)
+        counters.status_counts[old_key] = max(0, counters.status_counts[old_key] - 1)
+        counters.status_counts[new_key] += 1
+        counters.events += 1
+
+    def snapshot(self, guild: discord.Guild) -> Dict[str, Any]:
+        """Render current statistics for a guild in O(1)"""
+        counters = self._counters(guild)
+        total_members = guild.member_count or 0
+        voice_members = counters.voice_members
+        visible_members = counters.visible_members
+        online_count = counters.status_counts["online"]
+        idle_count = counters.status_counts["idle"]
+        dnd_count = counters.status_counts["dnd"]
+        offline_count = counters.status_counts["offline"]
+
+        # If we can't see many members, estimate based on voice activity and typical patterns
+        estimated = visible_members < total_members * MIN_VISIBLE_RATIO
+        if estimated:
+            estimated_online = max(voice_members * 2, total_members * 0.15)  # At least 15% typically online
+            estimated_online = min(estimated_online, total_members * 0.6)  # Cap at 60%
+
+            online_count = int(estimated_online * 0.4)  # 40% fully online
+            idle_count = int(estimated_online * 0.35)   # 35% idle
+            dnd_count = int(estimated_online * 0.25)    # 25% DND
+            offline_count = total_members - online_count - idle_count - dnd_count
+
+        return {
+            "total_members": total_members,
+            "online_members": online_count + idle_count + dnd_count,
+            "online": online_count,
+            "idle": idle_count,
+            "dnd": dnd_count,
+            "offline": offline_count,
+            "visible_members": visible_members,
+            "voice_members": voice_members,
+            "estimated": estimated
+        }
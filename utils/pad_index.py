@@ -0,0 +1,93 @@
+"""
+Per-guild, per-pad interval index of booked tryouts and trainings
+"""
+import bisect
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Booking(NamedTuple):
+    start: float
+    end: float
+    event_id: str
+    host_id: str
+
+
+class PadIndex:
+    """Sorted booking intervals for every (guild, pad)
+
+    New bookings that overlap are rejected, but stored events may already
+    overlap, so each pad also keeps the running maximum end time. It never
+    decreases, so the earliest booking reaching past a given time is found by
+    binary search, and conflict checks stay O(log n) on any data.
+    """
+
+    def __init__(self):
+        self.pads: Dict[Tuple[int, int], List[Booking]] = {}
+        self.max_ends: Dict[Tuple[int, int], List[float]] = {}  # max end of bookings[:i + 1]
+
+    def __len__(self):
+        return sum(len(bookings) for bookings in self.pads.values())
+
+    def clear(self):
+        self.pads.clear()
+        self.max_ends.clear()
+
+    def add(self, guild_id: int, pad: int, booking: Booking):
+        key = (guild_id, pad)
+        bookings = self.pads.setdefault(key, [])
+        max_ends = self.max_ends.setdefault(key, [])
+        index = bisect.bisect_right(bookings, booking)
+        bookings.insert(index, booking)
+        max_ends.insert(index, 0.0)
+        self._update_max_ends(bookings, max_ends, index)
+
+    def remove(self, guild_id: int, pad: int, booking: Booking):
+        """Drop a booking (e.g. one whose event failed to save)"""
+        key = (guild_id, pad)
+        bookings = self.pads.get(key, [])
+        index = bisect.bisect_left(bookings, booking)
+        if index < len(bookings) and bookings[index] == booking:
+            del bookings[index]
+            del self.max_ends[key][index]
+            self._update_max_ends(bookings, self.max_ends[key], index)
+
+    @staticmethod
+    def _update_max_ends(bookings: List[Booking], max_ends: List[float], index: int):
+        """Recompute the running maximum end from `index` onwards"""
+        running = max_ends[index - 1] if index else float("-inf")
+        for i in range(index, len(bookings)):
+            running = max(running, bookings[i].end)
+            max_ends[i] = running
+
+    def conflict(self, guild_id: int, pad: int, start: float, end: float) -> Optional[Booking]:
+        """A booking overlapping [start, end), if any"""
+        bookings = self.pads.get((guild_id, pad))
+        if not bookings:
+            return None
+        max_ends = self.max_ends[(guild_id, pad)]
+        index = bisect.bisect_left(bookings, (start,))
+        # Earliest booking starting before `start` that still runs past it
+        earlier = bisect.bisect_right(max_ends, start)
+        if earlier < index:
+            return bookings[earlier]
+        if index < len(bookings) and bookings[index].start < end:
+            return bookings[index]
+        return None
+
+    def free_slots(self, guild_id: int, pad: int, window_start: float, window_end: float,
+                   min_length: float = 0) -> List[Tuple[float, float]]:
+        """Gaps between bookings inside the window, at least `min_length` seconds long"""
+        bookings = self.pads.get((guild_id, pad), [])
+        # First booking that could reach into the window
+        index = bisect.bisect_right(self.max_ends.get((guild_id, pad), []), window_start)
+        slots = []
+        cursor = window_start
+        for booking in bookings[index:]:
+            if booking.start >= window_end:
+                break
+            if booking.start > cursor:
+                slots.append((cursor, booking.start))
+            cursor = max(cursor, booking.end)
+        if cursor < window_end:
+            slots.append((cursor, window_end))
+        return [(start, end) for start, end in slots if end - start >= min_length]
@@ -0,0 +1,67 @@
+"""
+Prefix trie of weighted strings for fast autocomplete
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[Tuple[int, str]] = []  # (-weight, key) of the best completions below this node
+
+
+class PrefixTrie:
+    """Case-insensitive trie where every node caches its `limit` best completions
+
+    Lookups walk the prefix and return the cached list, so they cost
+    O(len(prefix)) no matter how many values are stored. Weights only grow,
+    and each increment refreshes the cached lists along one path.
+    """
+
+    def __init__(self, limit: int = 25):
+        self.limit = limit
+        self.root = _Node()
+        self.weights: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return " ".join(value.lower().split())
+
+    def __len__(self):
+        return len(self.weights)
+
+    def add(self, value: str, weight: int = 1):
+        """Add `weight` to a value, keeping the first spelling seen for display"""
+        key = self.normalize(value)
+        if not key:
+            return
+        self.display.setdefault(key, " ".join(value.split()))
+        total = self.weights.get(key, 0) + weight
+        self.weights[key] = total
+
+        node = self.root
+        self._update_top(node, key, total)
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+            self._update_top(node, key, total)
+
+    def _update_top(self, node: _Node, key: str, weight: int):
+        entries = [entry for entry in node.top if entry[1] != key]
+        entries.append((-weight, key))
+        entries.sort()
+        node.top = entries[:self.limit]
+
+    def canonical(self, value: str) -> Optional[str]:
+        """Known spelling of a value, ignoring case and spacing"""
+        return self.display.get(self.normalize(value))
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        node = self.root
+        for char in self.normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self.display[key] for _, key in node.top[:limit or self.limit]]
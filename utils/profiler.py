@@ -0,0 +1,140 @@
+"""
+On-demand profilers: a stack sampler and a cProfile scope armed for one command
+"""
+import asyncio
+import collections
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename})"
+
+
+def sample_stacks(thread_id: int, duration: float, interval: float = 0.005) -> Tuple[str, int]:
+    """Sample one thread's stack for `duration` seconds (blocking, run it off the loop)
+
+    Returns the collapsed-stack text (one `root;...;leaf count` line per unique
+    stack, the input format of flamegraph.pl and speedscope) and the number of
+    samples taken.
+    """
+    stacks = collections.Counter()
+    samples = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            stacks[";".join(reversed(labels))] += 1
+            samples += 1
+        time.sleep(interval)
+    collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+    return collapsed + "\n", samples
+
+
+async def run_sampling_profile(duration: float, interval: float = 0.005) -> Tuple[str, int]:
+    """Sample the event loop thread from a worker thread without blocking the loop"""
+    thread_id = threading.get_ident()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, sample_stacks, thread_id, duration, interval)
+
+
+class CommandProfiler:
+    """cProfile scoped to the next run of a named command or task
+
+    cProfile hooks the whole thread, so awaits inside the scope also capture
+    whatever other tasks run in the meantime; the report is still dominated by
+    the armed command when it's the slow one.
+    """
+
+    def __init__(self):
+        self.armed_name: Optional[str] = None
+        self.profile: Optional[cProfile.Profile] = None
+        self.active_key = None
+        self.result: Optional[asyncio.Future] = None
+
+    def arm(self, name: str) -> asyncio.Future:
+        """Profile the next run of `name`; the future resolves to (stats text, raw .prof bytes)"""
+        if self.armed_name is not None or self.profile is not None:
+            raise RuntimeError("A cProfile session is already armed")
+        self.armed_name = name
+        self.result = asyncio.get_running_loop().create_future()
+        return self.result
+
+    def disarm(self):
+        if self.profile is not None:
+            self.profile.disable()
+        self.armed_name = None
+        self.profile = None
+        self.active_key = None
+        if self.result and not self.result.done():
+            self.result.cancel()
+        self.result = None
+
+    def start(self, name: str, key) -> bool:
+        """Start profiling if `name` is armed and no other scope is running"""
+        if self.armed_name != name or self.profile is not None:
+            return False
+        self.profile = cProfile.Profile()
+        self.active_key = key
+        self.profile.enable()
+        return True
+
+    def stop(self, key):
+        """Finish the scope started with `key` and publish the report"""
+        if self.profile is None or self.active_key != key:
+            return
+        self.profile.disable()
+        profile, result = self.profile, self.result
+        self.armed_name = None
+        self.profile = None
+        self.active_key = None
+        self.result = None
+
+        text = io.StringIO()
+        stats = pstats.Stats(profile, stream=text)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(60)
+        profile.create_stats()
+        raw = marshal.dumps(profile.stats)
+        if result and not result.done():
+            result.set_result((text.getvalue(), raw))
+
+    def scope(self, name: str):
+        """Context manager for profiling non-interaction work (e.g. scheduled tasks)"""
+        return _ProfileScope(self, name)
+
+
+class _ProfileScope:
+    def __init__(self, profiler: CommandProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.key = object()
+
+    def __enter__(self):
+        self.profiler.start(self.name, self.key)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profiler.stop(self.key)
+        return False
+
+
+command_profiler = CommandProfiler()
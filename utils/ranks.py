@@ -1,6 +1,15 @@
 """
 Military rank utilities for NATO rank structure mapping
 """
+import json
+import logging
+import os
+import time
+from typing import NamedTuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
 
 # NATO rank codes mapping to Roblox group ranks
 # This is a mock mapping - in reality this would be based on actual group ranks
@@ -65,26 +74,19 @@ RANK_NAMES = {
     "OF-13": "Supreme Commander",
 }
 
-def get_nato_rank(roblox_rank_id):
+def get_nato_rank(roblox_rank_id, guild_id=None, group_id=None):
     """
     Convert Roblox group rank ID to NATO rank code
     
     Args:
         roblox_rank_id (int): The rank ID from Roblox group
+        guild_id (int, optional): Guild whose rank table should be used
+        group_id (int, optional): Roblox group the rank belongs to
         
     Returns:
         str: NATO rank code (e.g., "OR-1", "OF-3")
     """
-    # Check if it's a mapped rank
-    if roblox_rank_id in RANK_MAPPING:
-        return RANK_MAPPING[roblox_rank_id]
-    
-    # For higher ranks not in mapping, assume they are high command
-    if roblox_rank_id >= 23:  # 23 is OF-9 (Lieutenant General)
-        return f"OF-{min(roblox_rank_id - 14, 13)}"  # Cap at OF-13
-    
-    # Default fallback
-    return "OR-1"
+    return rank_tables.lookup(roblox_rank_id, guild_id, group_id).code
 
 def get_rank_name(nato_code):
     """
@@ -181,26 +183,180 @@ def get_rank_initialism(nato_code):
     
     return rank_initialisms.get(nato_code, nato_code)
 
-def format_nickname(nato_rank, roblox_username):
+def format_nickname(rank, roblox_username):
     """
     Format the Discord nickname according to military standards
     Use [HQ] for ranks OF-9 and above
     
     Args:
-        nato_rank (str): NATO rank code
+        rank (RankInfo or str): Compiled rank entry, or a NATO rank code
         roblox_username (str): Roblox username
         
     Returns:
         str: Formatted nickname
     """
-    # Use [HQ] for ranks OF-9 and above
-    if nato_rank.startswith("OF-"):
-        rank_num = int(nato_rank.split("-")[1])
-        if rank_num >= 9:
-            # Use [HQ] for OF-9 and above
-            return f"[HQ] {roblox_username}"
-        else:
-            return f"[{nato_rank}] {roblox_username}"
-    else:
-        # All other ranks use NATO code
-        return f"[{nato_rank}] {roblox_username}"
+    prefix = rank.prefix if isinstance(rank, RankInfo) else nickname_prefix(rank)
+    return f"{prefix} {roblox_username}"
+
+def nickname_prefix(nato_code):
+    """
+    Nickname prefix for a NATO code ([HQ] for OF-9 and above), computed once per table entry
+    
+    Args:
+        nato_code (str): NATO rank code
+        
+    Returns:
+        str: Bracketed prefix
+    """
+    if nato_code.startswith("OF-") and nato_code[3:].isdigit() and int(nato_code[3:]) >= 9:
+        return "[HQ]"
+    return f"[{nato_code}]"
+
+class RankInfo(NamedTuple):
+    """Precomputed details of one rank"""
+    code: str
+    name: str
+    category: str
+    prefix: str
+
+def compile_rank_table(ranks, names=None):
+    """
+    Compile a rank mapping into a dense table indexed by Roblox rank ID (0-255)
+    
+    Rank IDs without an entry use the closest lower mapped ID, or the lowest
+    one below it, matching how unmapped ranks have always been treated.
+    
+    Args:
+        ranks (dict): Roblox rank ID -> NATO code, or -> {"code", "name", "prefix"}
+        names (dict, optional): NATO code -> full rank name overrides
+        
+    Returns:
+        list: 256 RankInfo entries
+    """
+    names = {**RANK_NAMES, **(names or {})}
+    compiled = {}
+    for rank_id, entry in ranks.items():
+        if isinstance(entry, str):
+            entry = {"code": entry}
+        code = entry["code"]
+        compiled[int(rank_id)] = RankInfo(
+            code=code,
+            name=entry.get("name", names.get(code, "Unknown Rank")),
+            category=get_rank_category(code),
+            prefix=entry.get("prefix", nickname_prefix(code))
+        )
+    if not compiled:
+        raise ValueError("Rank table has no entries")
+    
+    table = []
+    current = compiled[min(compiled)]
+    for rank_id in range(256):
+        current = compiled.get(rank_id, current)
+        table.append(current)
+    return table
+
+class RankTables:
+    """Per-guild and per-group rank tables loaded from JSON, reloaded when the file changes
+    
+    The file is checked at most once every `check_interval` seconds.
+    
+    File layout: {"default": {...}, "<guild_id>": {...}, "group:<group_id>": {...}}
+    where each table is {"ranks": {...}, "names": {...}}. Lookups try the guild,
+    then the group, then the default table (the built-in RANK_MAPPING unless
+    the file overrides it).
+    """
+    
+    def __init__(self, path, check_interval=0):
+        self.path = path
+        self.check_interval = check_interval  # Seconds between stat calls on the lookup path
+        self.next_check = 0.0
+        self.mtime = None
+        self.tables = {"default": compile_rank_table(RANK_MAPPING)}
+        self.managed = {}  # guild ID -> role names its tables can assign
+    
+    def reload_if_changed(self, force=False):
+        now = time.monotonic()
+        if not force and now < self.next_check:
+            return
+        self.next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        
+        tables = {"default": compile_rank_table(RANK_MAPPING)}
+        try:
+            data = {}
+            if mtime:
+                # Parse directly: a syntax error must not look like an empty file
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            for key, table in data.items():
+                tables[str(key)] = compile_rank_table(table.get("ranks", {}), table.get("names"))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # Keep serving the previous tables until the file is fixed
+            logger.error(f"Invalid rank tables in {self.path}: {e}")
+            return
+        self.tables = tables
+        self.managed = {}
+        logger.info(f"Loaded {len(tables)} rank table(s)")
+    
+    def lookup(self, roblox_rank_id, guild_id=None, group_id=None):
+        """O(1) rank lookup for a Roblox rank ID"""
+        self.reload_if_changed()
+        table = (
+            self.tables.get(str(guild_id))
+            or self.tables.get(f"group:{group_id}")
+            or self.tables["default"]
+        )
+        return table[max(0, min(255, int(roblox_rank_id)))]
+
+    
+    def managed_names(self, guild_id=None):
+        """Lowercased rank codes, names and categories the tables can assign in a guild
+        
+        A guild table replaces the group and default tables, otherwise any of
+        those may apply. The built-in codes and names are always included so
+        roles from before a table change are still cleaned up.
+        """
+        self.reload_if_changed()
+        key = str(guild_id)
+        names = self.managed.get(key)
+        if names is None:
+            if key in self.tables:
+                tables = [self.tables[key]]
+            else:
+                tables = [table for name, table in self.tables.items() if name == "default" or name.startswith("group:")]
+            names = {name.lower() for name in (*RANK_NAMES, *RANK_NAMES.values())}
+            for table in tables:
+                for rank in set(table):
+                    names.update(value.lower() for value in (rank.code, rank.name, rank.category))
+            names -= {"unknown", "unknown rank"}
+            names = self.managed[key] = frozenset(names)
+        return names
+
+rank_tables = RankTables(Config.RANK_TABLES_FILE, Config.RANK_TABLES_CHECK_INTERVAL)
+
+def resolve_group_ranks(groups, guild_id=None):
+    """
+    Compile a user's per-group Roblox ranks and pick the group that decides the nickname
+    
+    Args:
+        groups (dict): Group ID -> {"rank_id", "rank_name"} for the groups the user is in
+        guild_id (int, optional): Guild whose rank tables should be used
+        
+    Returns:
+        tuple: (deciding group ID, dict of group ID -> RankInfo)
+    """
+    group_ranks = {
+        group_id: rank_tables.lookup(info['rank_id'], guild_id, group_id)
+        for group_id, info in groups.items()
+    }
+    nickname_group_id = next(
+        (group_id for group_id in Config.ROBLOX_NICKNAME_PRECEDENCE if group_id in groups),
+        Config.ROBLOX_GROUP_ID
+    )
+    return nickname_group_id, group_ranks
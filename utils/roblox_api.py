@@ -4,15 +4,43 @@ Roblox API client for group rank verification
 import aiohttp
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple
+
+from config import Config
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, roblox_breaker
+from utils.metrics import ROBLOX_REQUESTS, ROBLOX_DURATION
+from utils.tracing import span
+from utils.roblox_worker import get_worker_pool
 
 logger = logging.getLogger(__name__)
 
+# When set, each request appends whether it succeeded (worker processes report these back)
+request_outcomes: ContextVar[Optional[List[bool]]] = ContextVar("request_outcomes", default=None)
+
+# Errors meaning Roblox is down or refused by the breaker, as opposed to a bad request
+UNAVAILABLE_ERRORS = (CircuitOpenError, asyncio.TimeoutError)
+
+def unavailable_result() -> Dict[str, Any]:
+    """verify_user_code result while Roblox can't be reached, callers may retry it later"""
+    return {
+        'success': False,
+        'unavailable': True,
+        'error': 'Roblox is currently unavailable, please try again in a few minutes'
+    }
+
+def is_failure_status(status: int) -> bool:
+    """Statuses that mean Roblox is struggling, as opposed to a bad request"""
+    return status == 429 or status >= 500
+
 class RobloxAPI:
-    def __init__(self, cookie: str):
+    def __init__(self, cookie: str, breaker: Optional[CircuitBreaker] = roblox_breaker):
         self.cookie = cookie
-        self.base_url = "https://groups.roblox.com/v1"
-        self.users_url = "https://users.roblox.com/v1"
+        self.base_url = Config.ROBLOX_GROUPS_URL
+        self.users_url = Config.ROBLOX_USERS_URL
+        self.thumbnails_url = Config.ROBLOX_THUMBNAILS_URL
+        self.breaker = breaker
         self.session = None
     
     async def __aenter__(self):
@@ -21,7 +49,8 @@ class RobloxAPI:
                 'Cookie': f'.ROBLOSECURITY={self.cookie}',
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'Accept': 'application/json'
-            }
+            },
+            timeout=aiohttp.ClientTimeout(total=Config.ROBLOX_REQUEST_TIMEOUT)
         )
         return self
     
@@ -29,6 +58,43 @@ class RobloxAPI:
         if self.session:
             await self.session.close()
     
+    async def _request(self, method: str, endpoint: str, url: str, **kwargs) -> Tuple[int, Optional[Any]]:
+        """Perform a request and record its latency and status, returns (status, json body)
+        
+        Raises CircuitOpenError without touching the network while the breaker is open.
+        """
+        if self.breaker:
+            try:
+                self.breaker.before_request()
+            except CircuitOpenError:
+                ROBLOX_REQUESTS.inc(endpoint=endpoint, status="breaker_open")
+                raise
+        start = time.perf_counter()
+        status = "error"
+        ok = None
+        try:
+            with span(f"roblox {endpoint}", method=method):
+                async with self.session.request(method, url, **kwargs) as response:
+                    status = str(response.status)
+                    ok = not is_failure_status(response.status)
+                    if response.status == 200:
+                        return response.status, await response.json()
+                    return response.status, None
+        except Exception:
+            ok = False  # Timeouts and connection errors count against Roblox
+            raise
+        finally:
+            ROBLOX_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+            ROBLOX_REQUESTS.inc(endpoint=endpoint, status=status)
+            if self.breaker:
+                if ok is None:
+                    self.breaker.release_probe()
+                else:
+                    self.breaker.record(ok)
+            outcomes = request_outcomes.get()
+            if outcomes is not None and ok is not None:
+                outcomes.append(ok)
+    
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user info by username"""
         try:
@@ -39,12 +105,12 @@ class RobloxAPI:
                 "usernames": [username],
                 "excludeBannedUsers": True
             }
-            async with self.session.post(url, json=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get('data') and len(result['data']) > 0:
-                        return result['data'][0]
-                return None
+            status, result = await self._request("POST", "usernames/users", url, json=data)
+            if status == 200 and result.get('data') and len(result['data']) > 0:
+                return result['data'][0]
+            return None
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error getting user by username: {e}")
             return None
@@ -55,43 +121,59 @@ class RobloxAPI:
             if not self.session:
                 return None
             url = f"{self.base_url}/users/{user_id}/groups/roles"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                return None
+            status, result = await self._request("GET", "groups/roles", url)
+            return result if status == 200 else None
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error getting user groups: {e}")
             return None
     
-    async def get_user_rank_in_group(self, user_id: int, group_id: int) -> Optional[Dict[str, Any]]:
-        """Get user's rank in specific group"""
+    async def get_user_group_ranks(self, user_id: int, group_ids: List[int]) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Get user's ranks in several groups from one groups/roles request
+        
+        Returns only the groups the user is a member of, keyed by group ID, or
+        None if the request failed.
+        """
         try:
             groups_data = await self.get_user_groups(user_id)
-            if groups_data and 'data' in groups_data:
-                for group in groups_data['data']:
-                    if group['group']['id'] == group_id:
-                        return {
-                            'rank_id': group['role']['rank'],
-                            'rank_name': group['role']['name'],
-                            'group_id': group_id,
-                            'user_id': user_id
-                        }
-            return None
+            if groups_data is None:
+                return None
+            memberships = {group['group']['id']: group['role'] for group in groups_data.get('data', [])}
+            ranks = {}
+            for group_id in group_ids:
+                role = memberships.get(group_id)
+                if role is not None:
+                    ranks[group_id] = {
+                        'rank_id': role['rank'],
+                        'rank_name': role['name'],
+                        'group_id': group_id,
+                        'user_id': user_id
+                    }
+            return ranks
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
-            logger.error(f"Error getting user rank in group: {e}")
+            logger.error(f"Error getting user group ranks: {e}")
             return None
     
+    async def get_user_rank_in_group(self, user_id: int, group_id: int) -> Optional[Dict[str, Any]]:
+        """Get user's rank in specific group"""
+        ranks = await self.get_user_group_ranks(user_id, [group_id])
+        return ranks.get(group_id) if ranks else None
+    
     async def get_user_description(self, user_id: int) -> Optional[str]:
         """Get user's profile description"""
         try:
             if not self.session:
                 return None
             url = f"{self.users_url}/users/{user_id}"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get('description', '')
-                return None
+            status, result = await self._request("GET", "users/{id}", url)
+            if status == 200:
+                return result.get('description', '')
+            return None
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error getting user description: {e}")
             return None
@@ -101,19 +183,47 @@ class RobloxAPI:
         try:
             if not self.session:
                 return None
-            url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=420x420&format=Png&isCircular=false"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get('data') and len(result['data']) > 0:
-                        return result['data'][0].get('imageUrl')
-                return None
+            url = f"{self.thumbnails_url}/users/avatar-headshot?userIds={user_id}&size=420x420&format=Png&isCircular=false"
+            status, result = await self._request("GET", "avatar-headshot", url)
+            if status == 200 and result.get('data') and len(result['data']) > 0:
+                return result['data'][0].get('imageUrl')
+            return None
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error getting user avatar: {e}")
             return None
     
-    async def verify_user_code(self, username: str, verification_code: str, group_id: int) -> Optional[Dict[str, Any]]:
-        """Verify user has the code in their description and get their rank"""
+    async def get_user_avatar_urls(self, user_ids: List[int]) -> Dict[int, str]:
+        """Get avatar image URLs for up to 100 users in one request"""
+        try:
+            if not self.session or not user_ids:
+                return {}
+            ids = ",".join(str(user_id) for user_id in user_ids[:100])
+            url = f"{self.thumbnails_url}/users/avatar-headshot?userIds={ids}&size=420x420&format=Png&isCircular=false"
+            status, result = await self._request("GET", "avatar-headshot", url)
+            if status != 200:
+                return {}
+            return {
+                item['targetId']: item['imageUrl']
+                for item in result.get('data', [])
+                if item.get('state') == 'Completed' and item.get('imageUrl')
+            }
+        except UNAVAILABLE_ERRORS:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting user avatars: {e}")
+            return {}
+    
+    async def verify_user_code(self, username: str, verification_code: str, group_id: int,
+                               subgroup_ids: Optional[List[int]] = None) -> Optional[Dict[str, Any]]:
+        """Verify user has the code in their description and get their rank
+        
+        Membership of `group_id` is required; ranks in `subgroup_ids` the user
+        belongs to are returned under 'groups' along with the main group's.
+        """
+        if self.breaker and not self.breaker.available:
+            return unavailable_result()
         try:
             # Get user info
             user_info = await self.get_user_by_username(username)
@@ -130,8 +240,9 @@ class RobloxAPI:
                     'error': 'Verification code not found in profile description'
                 }
             
-            # Get user's rank in the group
-            rank_info = await self.get_user_rank_in_group(user_id, group_id)
+            # Get user's ranks in the main group and subgroups from one request
+            group_ranks = await self.get_user_group_ranks(user_id, [group_id] + list(subgroup_ids or []))
+            rank_info = group_ranks.get(group_id) if group_ranks else None
             if not rank_info:
                 return {
                     'success': False,
@@ -145,9 +256,15 @@ class RobloxAPI:
                 'display_name': user_info.get('displayName', user_info['name']),
                 'rank_id': rank_info['rank_id'],
                 'rank_name': rank_info['rank_name'],
-                'group_id': group_id
+                'group_id': group_id,
+                'groups': {
+                    gid: {'rank_id': info['rank_id'], 'rank_name': info['rank_name']}
+                    for gid, info in group_ranks.items()
+                }
             }
             
+        except UNAVAILABLE_ERRORS:
+            return unavailable_result()
         except Exception as e:
             logger.error(f"Error verifying user: {e}")
             return {
@@ -155,7 +272,15 @@ class RobloxAPI:
                 'error': f'API error: {str(e)}'
             }
 
-async def verify_roblox_user(cookie: str, username: str, verification_code: str, group_id: int) -> Optional[Dict[str, Any]]:
+def roblox_client(cookie: str):
+    """RobloxAPI client, routed through the worker pool when one is running"""
+    pool = get_worker_pool()
+    if pool is not None:
+        return pool.client()
+    return RobloxAPI(cookie)
+
+async def verify_roblox_user(cookie: str, username: str, verification_code: str, group_id: int,
+                             subgroup_ids: Optional[List[int]] = None) -> Optional[Dict[str, Any]]:
     """Convenience function to verify a Roblox user"""
-    async with RobloxAPI(cookie) as api:
-        return await api.verify_user_code(username, verification_code, group_id)
\ No newline at end of file
+    async with roblox_client(cookie) as api:
+        return await api.verify_user_code(username, verification_code, group_id, subgroup_ids)
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Local stand-in for the Roblox endpoints RobloxAPI uses, for offline load and integration testing
+
+    python -m utils.roblox_standin --users 1000000 --latency 0.05 --error-rate 0.02
+
+then start the bot (or a benchmark) with the ROBLOX_*_URL variables it prints.
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+USERNAME_PREFIX = "StandinUser"
+# 1x1 transparent PNG served for every avatar
+AVATAR_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class RobloxStandIn:
+    """Serves synthetic users, group ranks and avatars with injectable faults
+
+    Users 1..`users` exist and are derived from their ID on demand, so very
+    large datasets cost no memory. Each user belongs to the first group with
+    probability `member_rate` and to each other group with probability
+    `subgroup_rate`, at a stable pseudo-random rank.
+
+    Faults apply to every API request: `latency` (plus up to `jitter`) seconds
+    of delay, an `error_rate` of 500/503 responses, a `throttle_rate` of 429s,
+    and a hard `max_rps` above which requests get 429.
+    """
+
+    def __init__(self, users: int = 10000, groups: Optional[List[int]] = None, member_rate: float = 0.9,
+                 subgroup_rate: float = 0.3, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, max_rps: float = 0.0, seed: int = 0):
+        self.users = users
+        self.groups = groups or [Config.ROBLOX_GROUP_ID, *Config.ROBLOX_SUBGROUP_IDS]
+        self.member_rate = member_rate
+        self.subgroup_rate = subgroup_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.seed = seed
+        self.descriptions: Dict[int, str] = {}  # Set through the control endpoint
+        self.requests: Dict[str, int] = {}  # "endpoint status" -> count
+        self.window_start = 0.0
+        self.window_count = 0
+
+    # Synthetic data
+
+    def exists(self, user_id: int) -> bool:
+        return 1 <= user_id <= self.users
+
+    def username(self, user_id: int) -> str:
+        return f"{USERNAME_PREFIX}{user_id}"
+
+    def user_id_for(self, username: str) -> Optional[int]:
+        if username.lower().startswith(USERNAME_PREFIX.lower()):
+            suffix = username[len(USERNAME_PREFIX):]
+            if suffix.isdigit() and self.exists(int(suffix)):
+                return int(suffix)
+        return None
+
+    def memberships(self, user_id: int) -> Dict[int, int]:
+        """Group ID -> rank (1-255) for the groups a user belongs to"""
+        rng = random.Random(user_id * 1_000_003 + self.seed)
+        ranks = {}
+        for index, group_id in enumerate(self.groups):
+            if rng.random() < (self.member_rate if index == 0 else self.subgroup_rate):
+                ranks[group_id] = rng.randint(1, 255)
+        return ranks
+
+    def user_json(self, user_id: int) -> Dict[str, Any]:
+        name = self.username(user_id)
+        return {"id": user_id, "name": name, "displayName": name, "hasVerifiedBadge": False}
+
+    # Fault injection
+
+    @web.middleware
+    async def faults(self, request: web.Request, handler):
+        if request.path.startswith("/_standin"):
+            return await handler(request)
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        response = await self.inject(request) or await handler(request)
+        key = f"{endpoint} {response.status}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+        return response
+
+    async def inject(self, request: web.Request) -> Optional[web.Response]:
+        """Delay the request, and return an error response if one should be injected"""
+        if self.max_rps:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if self.window_count > self.max_rps:
+                return web.json_response({"errors": [{"code": 0, "message": "Too many requests"}]}, status=429)
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = random.random()
+        if roll < self.throttle_rate:
+            return web.json_response({"errors": [{"code": 0, "message": "Too many requests"}]}, status=429)
+        if roll < self.throttle_rate + self.error_rate:
+            return web.json_response({"errors": [{"code": 0, "message": "InternalServerError"}]},
+                                     status=random.choice((500, 503)))
+        return None
+
+    # Roblox endpoints
+
+    async def usernames_users(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        data = []
+        for username in body.get("usernames", []):
+            user_id = self.user_id_for(username)
+            if user_id is not None:
+                data.append({"requestedUsername": username, **self.user_json(user_id)})
+        return web.json_response({"data": data})
+
+    async def user(self, request: web.Request) -> web.Response:
+        user_id = int(request.match_info["user_id"])
+        if not self.exists(user_id):
+            return web.json_response({"errors": [{"code": 3, "message": "The user id is invalid."}]}, status=404)
+        return web.json_response({
+            **self.user_json(user_id),
+            "description": self.descriptions.get(user_id, ""),
+            "created": "2020-01-01T00:00:00.000Z",
+            "isBanned": False,
+            "externalAppDisplayName": None
+        })
+
+    async def group_roles(self, request: web.Request) -> web.Response:
+        user_id = int(request.match_info["user_id"])
+        if not self.exists(user_id):
+            return web.json_response({"errors": [{"code": 3, "message": "The user id is invalid."}]}, status=400)
+        data = [
+            {
+                "group": {"id": group_id, "name": f"Group {group_id}", "memberCount": self.users, "hasVerifiedBadge": False},
+                "role": {"id": group_id * 1000 + rank, "name": f"Rank {rank}", "rank": rank}
+            }
+            for group_id, rank in self.memberships(user_id).items()
+        ]
+        return web.json_response({"data": data})
+
+    async def avatar_headshot(self, request: web.Request) -> web.Response:
+        ids = [int(i) for i in request.query.get("userIds", "").split(",") if i.strip().isdigit()]
+        size = request.query.get("size", "420x420")
+        data = [
+            {
+                "targetId": user_id,
+                "state": "Completed" if self.exists(user_id) else "Blocked",
+                "imageUrl": f"http://{request.host}/_standin/avatars/{user_id}-{size}.png" if self.exists(user_id) else None,
+                "version": "TN3"
+            }
+            for user_id in ids[:100]
+        ]
+        return web.json_response({"data": data})
+
+    async def avatar_image(self, request: web.Request) -> web.Response:
+        return web.Response(body=AVATAR_PNG, content_type="image/png")
+
+    # Control endpoints
+
+    async def set_description(self, request: web.Request) -> web.Response:
+        """PUT /_standin/users/{id}/description with {"description": "..."}"""
+        user_id = int(request.match_info["user_id"])
+        self.descriptions[user_id] = (await request.json()).get("description", "")
+        return web.json_response({"id": user_id, "description": self.descriptions[user_id]})
+
+    async def set_faults(self, request: web.Request) -> web.Response:
+        """POST /_standin/faults to change latency/error rates at runtime (e.g. to simulate an outage)"""
+        body = await request.json()
+        for name in ("latency", "jitter", "error_rate", "throttle_rate", "max_rps"):
+            if name in body:
+                setattr(self, name, float(body[name]))
+        return web.json_response(self.settings())
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"settings": self.settings(), "requests": self.requests})
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "users": self.users,
+            "groups": self.groups,
+            "latency": self.latency,
+            "jitter": self.jitter,
+            "error_rate": self.error_rate,
+            "throttle_rate": self.throttle_rate,
+            "max_rps": self.max_rps
+        }
+
+    def app(self) -> web.Application:
+        """One app serving the groups, users and thumbnails APIs under path prefixes"""
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_post("/users/v1/usernames/users", self.usernames_users)
+        app.router.add_get("/users/v1/users/{user_id:\\d+}", self.user)
+        app.router.add_get("/groups/v1/users/{user_id:\\d+}/groups/roles", self.group_roles)
+        app.router.add_get("/thumbnails/v1/users/avatar-headshot", self.avatar_headshot)
+        app.router.add_get("/_standin/avatars/{name}", self.avatar_image)
+        app.router.add_put("/_standin/users/{user_id:\\d+}/description", self.set_description)
+        app.router.add_post("/_standin/faults", self.set_faults)
+        app.router.add_get("/_standin/stats", self.stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8790) -> web.AppRunner:
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def environment(host: str, port: int) -> Dict[str, str]:
+    """Environment variables that point RobloxAPI at a stand-in"""
+    base = f"http://{host}:{port}"
+    return {
+        "ROBLOX_GROUPS_URL": f"{base}/groups/v1",
+        "ROBLOX_USERS_URL": f"{base}/users/v1",
+        "ROBLOX_THUMBNAILS_URL": f"{base}/thumbnails/v1"
+    }
+
+
+async def serve(standin: RobloxStandIn, host: str, port: int):
+    runner = await standin.start(host, port)
+    logger.info(f"Roblox stand-in serving {standin.users:,} users on {host}:{port}")
+    for name, value in environment(host, port).items():
+        print(f"export {name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Roblox API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--users", type=int, default=10000, help="number of synthetic users")
+    parser.add_argument("--groups", type=lambda v: [int(g) for g in v.split(",")], default=None,
+                        help="comma-separated group IDs, main group first (default from config)")
+    parser.add_argument("--member-rate", type=float, default=0.9, help="share of users in the main group")
+    parser.add_argument("--subgroup-rate", type=float, default=0.3, help="share of users in each subgroup")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay of up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500/503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="answer 429 above this many requests per second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    standin = RobloxStandIn(
+        users=args.users, groups=args.groups, member_rate=args.member_rate, subgroup_rate=args.subgroup_rate,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps, seed=args.seed
+    )
+    try:
+        asyncio.run(serve(standin, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,232 @@
+"""
+Out-of-process Roblox API worker pool reached over multiprocessing queues
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.circuit_breaker import roblox_breaker
+from utils.metrics import ROBLOX_REQUESTS, ROBLOX_DURATION, QUEUE_DEPTH
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# RobloxAPI methods that may be called through the pool
+ALLOWED_METHODS = {
+    "get_user_by_username",
+    "get_user_groups",
+    "get_user_rank_in_group",
+    "get_user_group_ranks",
+    "get_user_description",
+    "get_user_avatar_url",
+    "get_user_avatar_urls",
+    "verify_user_code",
+}
+
+
+class RobloxWorkerError(Exception):
+    """Raised when a worker fails or doesn't answer in time"""
+
+    def __init__(self, message: str, outcomes: Optional[list] = None):
+        super().__init__(message)
+        self.outcomes = outcomes or []  # Request outcomes of the failed job, for the breaker
+
+
+async def _worker_main(cookie: str, requests, responses, concurrency: int):
+    from utils.roblox_api import RobloxAPI, request_outcomes
+
+    loop = asyncio.get_running_loop()
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def handle(job_id: int, method: str, args: tuple, kwargs: dict):
+        async with limiter:
+            outcomes = []
+            request_outcomes.set(outcomes)  # Each job runs in its own task, so this is per job
+            try:
+                result = await getattr(api, method)(*args, **kwargs)
+                responses.put((job_id, True, (result, outcomes)))
+            except Exception as e:
+                responses.put((job_id, False, (f"{type(e).__name__}: {e}", outcomes)))
+
+    in_flight = set()
+    # The parent process owns the circuit breaker and gates jobs before they are sent
+    async with RobloxAPI(cookie, breaker=None) as api:
+        while True:
+            job = await loop.run_in_executor(None, requests.get)
+            if job is None:
+                break
+            job_id, method, args, kwargs = job
+            if method not in ALLOWED_METHODS:
+                responses.put((job_id, False, f"Method not allowed: {method}"))
+                continue
+            task = loop.create_task(handle(job_id, method, args, kwargs))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        # Finish jobs that were already accepted before closing the session
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+def _worker_process(cookie: str, requests, responses, concurrency: int):
+    """Entry point of a worker process"""
+    try:
+        asyncio.run(_worker_main(cookie, requests, responses, concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+class RobloxWorkerPool:
+    """Runs RobloxAPI calls in worker processes so the gateway loop stays light
+
+    Jobs go out on one shared request queue; results come back on a response
+    queue and are matched to waiting futures by job ID. Workers report whether
+    each job's requests succeeded, which feeds the parent's circuit breaker.
+    """
+
+    def __init__(self, cookie: str, workers: int = 2, timeout: float = 15.0, concurrency: int = 20):
+        self.cookie = cookie
+        self.worker_count = workers
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.context = multiprocessing.get_context("spawn")
+        self.requests = self.context.Queue()
+        self.responses = self.context.Queue()
+        self.processes = []
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.job_ids = itertools.count(1)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._closing = False
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        for index in range(self.worker_count):
+            process = self.context.Process(
+                target=_worker_process,
+                args=(self.cookie, self.requests, self.responses, self.concurrency),
+                name=f"roblox-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        self._reader = threading.Thread(target=self._read_responses, name="roblox-worker-reader", daemon=True)
+        self._reader.start()
+        QUEUE_DEPTH.set_function(lambda: len(self.pending), queue="roblox_workers")
+        logger.info(f"Started {self.worker_count} Roblox worker process(es)")
+
+    def _read_responses(self):
+        while not self._closing:
+            try:
+                job_id, ok, payload = self.responses.get(timeout=1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            self.loop.call_soon_threadsafe(self._resolve, job_id, ok, payload)
+
+    def _resolve(self, job_id: int, ok: bool, payload: Any):
+        future = self.pending.pop(job_id, None)
+        if future is None or future.done():
+            return  # Caller already timed out
+        if ok:
+            future.set_result(payload)
+        elif isinstance(payload, tuple):
+            future.set_exception(RobloxWorkerError(*payload))
+        else:
+            future.set_exception(RobloxWorkerError(payload))
+
+    async def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a RobloxAPI method in a worker and wait for its result"""
+        if method not in ALLOWED_METHODS:
+            raise RobloxWorkerError(f"Method not allowed: {method}")
+        if self._closing:
+            raise RobloxWorkerError("Worker pool is shutting down")
+
+        roblox_breaker.before_request()
+        job_id = next(self.job_ids)
+        future = self.loop.create_future()
+        self.pending[job_id] = future
+        start = time.perf_counter()
+        status = "ok"
+        healthy = None
+        try:
+            with span(f"roblox_pool {method}"):
+                self.requests.put((job_id, method, args, kwargs))
+                result, outcomes = await asyncio.wait_for(future, timeout or self.timeout)
+                if outcomes:
+                    healthy = all(outcomes)
+                return result
+        except asyncio.TimeoutError:
+            status = "timeout"
+            healthy = False
+            raise RobloxWorkerError(f"{method} timed out after {timeout or self.timeout}s")
+        except RobloxWorkerError as e:
+            status = "error"
+            if e.outcomes:
+                healthy = all(e.outcomes)
+            raise
+        finally:
+            self.pending.pop(job_id, None)
+            ROBLOX_DURATION.observe(time.perf_counter() - start, endpoint=f"pool:{method}")
+            ROBLOX_REQUESTS.inc(endpoint=f"pool:{method}", status=status)
+            if healthy is None:
+                roblox_breaker.release_probe()
+            else:
+                roblox_breaker.record(healthy)
+
+    def client(self) -> "PooledRobloxAPI":
+        return PooledRobloxAPI(self)
+
+    async def close(self, timeout: float = 5.0):
+        """Stop the workers after they finish their current jobs"""
+        for _ in self.processes:
+            self.requests.put(None)
+        loop = asyncio.get_running_loop()
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                process.terminate()
+        self._closing = True
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RobloxWorkerError("Worker pool closed"))
+        self.pending.clear()
+
+
+class PooledRobloxAPI:
+    """Drop-in stand-in for `async with RobloxAPI(cookie) as api` that uses the pool"""
+
+    def __init__(self, pool: RobloxWorkerPool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def __getattr__(self, name: str):
+        if name not in ALLOWED_METHODS:
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            return await self.pool.call(name, *args, **kwargs)
+
+        return method
+
+
+_pool: Optional[RobloxWorkerPool] = None
+
+
+def set_worker_pool(pool: Optional[RobloxWorkerPool]):
+    global _pool
+    _pool = pool
+
+
+def get_worker_pool() -> Optional[RobloxWorkerPool]:
+    return _pool
@@ -0,0 +1,132 @@
+"""
+Rank-to-Discord-role synchronization through one rate-limited edit queue
+"""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+import discord
+
+from utils.metrics import QUEUE_DEPTH
+from utils.ranks import RankInfo, rank_tables
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_ROLES = ("Enlisted", "Warrant Officer", "Officer")
+
+INTERACTIVE = 0  # Priority of syncs a user is waiting on
+BACKGROUND = 1
+
+
+class RoleDiff(NamedTuple):
+    add: List[discord.Role]
+    remove: List[discord.Role]
+    nick: Optional[str]
+
+    @property
+    def empty(self) -> bool:
+        return not self.add and not self.remove and self.nick is None
+
+
+def target_roles(guild: discord.Guild, rank: RankInfo) -> Set[discord.Role]:
+    """Roles a member of this rank should have (ones missing from the guild are skipped)"""
+    by_name: Dict[str, discord.Role] = {role.name.lower(): role for role in guild.roles}
+    wanted = {rank.category.lower(), rank.code.lower(), rank.name.lower()}
+    return {by_name[name] for name in wanted if name in by_name}
+
+
+def managed_role_names(guild: discord.Guild) -> Set[str]:
+    """Role names the engine manages in a guild: categories plus every code and name its rank tables use"""
+    return rank_tables.managed_names(guild.id) | {name.lower() for name in CATEGORY_ROLES}
+
+
+def compute_diff(member: discord.Member, rank: RankInfo, nickname: Optional[str] = None) -> RoleDiff:
+    """Roles to add and remove (and the nickname to set) to bring a member in line with a rank"""
+    managed = managed_role_names(member.guild)
+    target = {role for role in target_roles(member.guild, rank) if role.name.lower() in managed}
+    current = {role for role in member.roles if role.name.lower() in managed}
+
+    def assignable(role: discord.Role) -> bool:
+        return not role.managed and role < member.guild.me.top_role
+
+    add = sorted((role for role in target - current if assignable(role)), key=lambda r: r.position)
+    remove = sorted((role for role in current - target if assignable(role)), key=lambda r: r.position)
+    nick = nickname if nickname is not None and member.nick != nickname else None
+    return RoleDiff(add, remove, nick)
+
+
+class RoleSyncQueue:
+    """Applies rank role/nickname changes one member edit at a time, at most `rate` edits per second
+
+    Interactive jobs (a user verifying) jump ahead of queued background work.
+    Each job computes its diff when it runs, so a member queued twice is only
+    edited once.
+    """
+
+    def __init__(self, rate: float = 2.0):
+        self.interval = 1.0 / rate
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.counter = itertools.count()
+        self.last_edit = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return self.queue.qsize()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+            QUEUE_DEPTH.set_function(lambda: len(self), queue="role_sync")
+
+    def submit(self, member: discord.Member, rank: RankInfo, nickname: Optional[str] = None,
+               priority: int = BACKGROUND) -> asyncio.Future:
+        """Queue a sync; the future resolves to the applied RoleDiff"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((priority, next(self.counter), member, rank, nickname, future))
+        return future
+
+    async def _worker(self):
+        while True:
+            _, _, member, rank, nickname, future = await self.queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                diff = compute_diff(member, rank, nickname)
+                if not diff.empty:
+                    delay = self.last_edit + self.interval - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await self.apply(member, diff)
+                    self.last_edit = time.monotonic()
+                if not future.done():
+                    future.set_result(diff)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                else:
+                    logger.error(f"Role sync for {member} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def apply(self, member: discord.Member, diff: RoleDiff):
+        """One combined member edit for roles and nickname"""
+        kwargs = {"reason": f"Rank sync ({', '.join(role.name for role in diff.add) or 'no new roles'})"}
+        if diff.add or diff.remove:
+            removed = set(diff.remove)
+            kwargs["roles"] = [role for role in member.roles if role not in removed and not role.is_default()] + diff.add
+        if diff.nick is not None:
+            kwargs["nick"] = diff.nick
+        await member.edit(**kwargs)
+
+    async def drain(self, timeout: float):
+        """Wait for queued edits to finish, up to `timeout` seconds"""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Role sync queue not drained, {len(self)} job(s) left")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
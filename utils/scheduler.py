@@ -0,0 +1,213 @@
+"""
+Heap-based schedulers: staggered per-guild refreshes and one-shot timers
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StaggeredScheduler:
+    """Run a refresh callback per key, spread across a window instead of all at once
+
+    Each key gets a stable offset inside the window (plus jitter) for its first
+    run. After every run the callback returns how much activity happened since
+    the previous run; idle keys back off towards `max_interval` and busy keys
+    are refreshed more often, down to `min_interval`.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[int], Awaitable[int]],
+        window: float = 300,
+        min_interval: float = 60,
+        max_interval: float = 900,
+        busy_threshold: int = 50,
+        jitter: float = 0.1
+    ):
+        self.callback = callback
+        self.window = window
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.busy_threshold = busy_threshold
+        self.jitter = jitter
+        self.intervals: Dict[int, float] = {}
+        self.due: Dict[int, float] = {}
+        self.heap: List[Tuple[float, int]] = []
+        self.running: Dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self.due)
+
+    def _jittered(self, delay: float) -> float:
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _push(self, key: int, due: float):
+        self.due[key] = due
+        heapq.heappush(self.heap, (due, key))
+        if self.heap[0][1] == key:
+            self._wakeup.set()
+
+    def add(self, key: int):
+        """Schedule a key at its stable offset within the window"""
+        if key in self.due:
+            return
+        offset = zlib.crc32(str(key).encode()) % max(1, int(self.window))
+        self.intervals[key] = self.window
+        self._push(key, time.monotonic() + self._jittered(offset))
+
+    def refresh_soon(self, key: int, delay: float = 0):
+        """Move a key's next run forward (e.g. after its configuration changed)"""
+        self.intervals.setdefault(key, self.window)
+        self._push(key, time.monotonic() + delay)
+
+    def remove(self, key: int):
+        self.due.pop(key, None)
+        self.intervals.pop(key, None)
+
+    def _next_interval(self, key: int, activity: int) -> float:
+        interval = self.intervals.get(key, self.window)
+        if activity <= 0:
+            interval = min(self.max_interval, interval * 1.5)
+        elif activity >= self.busy_threshold:
+            interval = max(self.min_interval, interval / 2)
+        else:
+            interval = min(max(self.min_interval, self.window), self.max_interval)
+        self.intervals[key] = interval
+        return interval
+
+    async def _run_one(self, key: int):
+        activity = 0
+        try:
+            activity = await self.callback(key)
+        except Exception as e:
+            logger.error(f"Scheduled refresh for {key} failed: {e}")
+        finally:
+            self.running.pop(key, None)
+        if key in self.intervals:
+            self._push(key, time.monotonic() + self._jittered(self._next_interval(key, activity or 0)))
+
+    async def _loop(self):
+        while True:
+            # Discard stale heap entries left behind by reschedules and removals
+            while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+
+            if not self.heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, key = self.heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            del self.due[key]
+            if key in self.running:
+                continue  # Previous refresh still in flight, it will reschedule itself
+            self.running[key] = asyncio.create_task(self._run_one(key))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        for task in list(self.running.values()):
+            task.cancel()
+
+
+class TimerHeap:
+    """One-shot timers at absolute (wall clock) times, served by a single task
+
+    Timers live in a heap ordered by due time; one task sleeps until the
+    earliest one, so thousands of pending timers cost a heap entry each rather
+    than a sleeping task each. Cancelling or rescheduling a key leaves a stale
+    heap entry behind that is skipped when it reaches the top.
+    """
+
+    def __init__(self, callback: Callable[[Hashable, Any], Awaitable[None]]):
+        self.callback = callback
+        self.heap: List[Tuple[float, int, Hashable]] = []
+        self.due: Dict[Hashable, Tuple[float, int]] = {}
+        self.payloads: Dict[Hashable, Any] = {}
+        self.counter = itertools.count()
+        self.firing = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self.due)
+
+    def __contains__(self, key: Hashable):
+        return key in self.due
+
+    def schedule(self, key: Hashable, fire_at: float, payload: Any = None):
+        """Fire `callback(key, payload)` at the UNIX time `fire_at`, replacing any timer for `key`"""
+        entry = (fire_at, next(self.counter))
+        self.due[key] = entry
+        self.payloads[key] = payload
+        heapq.heappush(self.heap, (entry[0], entry[1], key))
+        if self.heap[0][2] == key:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable):
+        self.due.pop(key, None)
+        self.payloads.pop(key, None)
+
+    async def _fire(self, key: Hashable, payload: Any):
+        try:
+            await self.callback(key, payload)
+        except Exception as e:
+            logger.error(f"Timer {key} failed: {e}")
+
+    async def _loop(self):
+        while True:
+            while self.heap and self.due.get(self.heap[0][2]) != self.heap[0][:2]:
+                heapq.heappop(self.heap)
+
+            if not self.heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            fire_at, _, key = self.heap[0]
+            delay = fire_at - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    # Capped so wall clock adjustments are picked up
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, 300))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            del self.due[key]
+            task = asyncio.create_task(self._fire(key, self.payloads.pop(key, None)))
+            self.firing.add(task)
+            task.add_done_callback(self.firing.discard)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
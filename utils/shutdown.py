@@ -0,0 +1,93 @@
+"""
+Graceful shutdown: refuse new interactions, drain in-flight work, then stop
+"""
+import asyncio
+import logging
+import signal
+import sys
+import time
+from typing import Callable, Optional, Set
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+DRAINING_MESSAGE = "🔄 The bot is restarting for an update. Please try again in a minute!"
+
+
+def add_signal_handlers(callback: Callable[[int], None], signals=(signal.SIGTERM, signal.SIGINT)):
+    """Call `callback(sig)` on the running loop when a shutdown signal arrives
+
+    Windows event loops have no add_signal_handler, so there the plain
+    signal module is used and the callback is handed back to the loop.
+    """
+    loop = asyncio.get_running_loop()
+    for sig in signals:
+        if sys.platform != "win32":
+            loop.add_signal_handler(sig, callback, sig)
+        else:
+            signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(callback, signum))
+
+
+class ShutdownCoordinator:
+    """Tracks the tasks handling interactions so a shutdown can wait for them"""
+
+    def __init__(self):
+        self.draining = False
+        self.tasks: Set[asyncio.Task] = set()
+        self._drain_event: Optional[asyncio.Event] = None
+
+    @property
+    def drain_event(self) -> asyncio.Event:
+        if self._drain_event is None:
+            self._drain_event = asyncio.Event()
+        return self._drain_event
+
+    def track_current(self):
+        """Register the running task as in-flight work"""
+        task = asyncio.current_task()
+        if task is not None and task not in self.tasks:
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def admit(self, interaction: discord.Interaction) -> bool:
+        """Interaction gate: tracks the interaction, or turns it away while draining"""
+        if not self.draining:
+            self.track_current()
+            return True
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(DRAINING_MESSAGE, ephemeral=True)
+            else:
+                await interaction.response.send_message(DRAINING_MESSAGE, ephemeral=True)
+        except discord.HTTPException:
+            pass
+        return False
+
+    async def sleep(self, delay: float):
+        """Sleep that ends early once a drain starts (for deliberate delays like ticket deletion)"""
+        try:
+            await asyncio.wait_for(self.drain_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def start_draining(self):
+        self.draining = True
+        self.drain_event.set()
+
+    async def drain(self, deadline: float) -> int:
+        """Wait up to `deadline` seconds for in-flight work, returns how many tasks were left"""
+        start = time.monotonic()
+        current = asyncio.current_task()
+        pending = {task for task in self.tasks if task is not current and not task.done()}
+        if pending:
+            logger.info(f"Draining {len(pending)} in-flight interaction(s)")
+            _, pending = await asyncio.wait(pending, timeout=deadline)
+        if pending:
+            logger.warning(f"Drain deadline reached with {len(pending)} interaction(s) still running")
+        else:
+            logger.info(f"Drained in-flight work in {time.monotonic() - start:.2f}s")
+        return len(pending)
+
+
+shutdown = ShutdownCoordinator()
@@ -0,0 +1,58 @@
+"""
+Startup phase timings, logged as one report once the bot is fully warmed up
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long each startup phase took, relative to process start"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark(self, name: str):
+        """Remember when a milestone was reached"""
+        self.marks.setdefault(name, time.perf_counter())
+
+    def since(self, name: str) -> Optional[float]:
+        """Seconds elapsed since a milestone, None if it wasn't reached"""
+        if name not in self.marks:
+            return None
+        return time.perf_counter() - self.marks[name]
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> str:
+        lines = [f"Startup timings (total {self.elapsed():.2f}s):"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<16} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def log_report(self):
+        if not self.reported:
+            self.reported = True
+            logger.info(self.report())
+
+
+# Imported first by main.py so the "imports" phase starts at process start
+startup_timer = StartupTimer()
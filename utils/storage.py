@@ -0,0 +1,80 @@
+"""
+JSON file storage helpers with timing metrics and cross-process locking
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single process only
+    fcntl = None
+
+from utils.metrics import STORAGE_DURATION
+from utils.tracing import span
+
+
+def _read_json(path: str) -> Any:
+    """Load a JSON file, raising FileNotFoundError or json.JSONDecodeError"""
+    start = time.perf_counter()
+    try:
+        with span("storage.load", file=os.path.basename(path)), open(path, 'r') as f:
+            return json.load(f)
+    finally:
+        STORAGE_DURATION.observe(time.perf_counter() - start, operation="load", file=os.path.basename(path))
+
+
+def load_json(path: str, default: Any = None) -> Any:
+    """Load a JSON file, returning `default` if it's missing or corrupt"""
+    try:
+        return _read_json(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {} if default is None else default
+
+
+def save_json(path: str, data: Any, indent: int = 2):
+    """Write data to a JSON file, creating its directory if needed"""
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Write to a temporary file and swap it in so readers never see a partial file
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with span("storage.save", file=os.path.basename(path)):
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=indent)
+            os.replace(tmp_path, path)
+    finally:
+        STORAGE_DURATION.observe(time.perf_counter() - start, operation="save", file=os.path.basename(path))
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on a data file, shared by every bot process (cluster)"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def update_json(path: str, mutate: Callable[[Any], None], indent: int = 2) -> Any:
+    """Load, mutate in place and save a JSON file under the cross-process lock
+
+    A corrupt file raises json.JSONDecodeError rather than being overwritten
+    with only the new changes.
+    """
+    with file_lock(path):
+        try:
+            data = _read_json(path)
+        except FileNotFoundError:
+            data = {}
+        mutate(data)
+        save_json(path, data, indent=indent)
+        return data
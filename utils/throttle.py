@@ -0,0 +1,101 @@
+"""
+In-memory per-user and per-guild token-bucket throttling for commands and buttons
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from config import Config
+
+
+class Throttled(app_commands.CheckFailure):
+    """Raised by the app command check when a bucket is empty"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} throttled, retry after {retry_after:.1f}s")
+
+
+class TokenBuckets:
+    """Token buckets keyed by anything hashable, bounded by an LRU
+
+    A bucket holds up to `capacity` tokens and refills at capacity/period per
+    second. Evicting a bucket only forgets a partially used allowance, so the
+    LRU bound costs at most a little extra leniency.
+    """
+
+    def __init__(self, max_buckets: int = 10000):
+        self.max_buckets = max_buckets
+        self.buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()  # key -> [tokens, updated]
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def _tokens(self, key: Hashable, capacity: float, period: float, now: float) -> float:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return capacity
+        return min(capacity, bucket[0] + (now - bucket[1]) * capacity / period)
+
+    def acquire(self, limits: List[Tuple[Hashable, float, float]]) -> Optional[float]:
+        """Take one token from every (key, capacity, period) bucket, or none if any is empty
+
+        Returns None when allowed, otherwise the seconds until all buckets have a token.
+        """
+        now = time.monotonic()
+        levels = [self._tokens(key, capacity, period, now) for key, capacity, period in limits]
+        waits = [
+            (1 - tokens) * period / capacity
+            for tokens, (_, capacity, period) in zip(levels, limits)
+            if tokens < 1
+        ]
+        if waits:
+            return max(waits)
+
+        for tokens, (key, _, _) in zip(levels, limits):
+            self.buckets[key] = [tokens - 1, now]
+            self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_buckets:
+            self.buckets.popitem(last=False)
+        return None
+
+
+buckets = TokenBuckets(Config.THROTTLE_MAX_BUCKETS)
+
+
+def check_throttle(name: str, interaction: discord.Interaction) -> Optional[float]:
+    """Consume the user's and guild's tokens for `name`, returns the retry delay if throttled"""
+    rule = Config.THROTTLE_LIMITS[name]
+    limits = [((name, "user", interaction.user.id), *rule["user"])]
+    if interaction.guild_id and "guild" in rule:
+        limits.append(((name, "guild", interaction.guild_id), *rule["guild"]))
+    return buckets.acquire(limits)
+
+
+def throttle_message(retry_after: float) -> str:
+    return f"⏳ You're doing that too fast! Try again in {math.ceil(retry_after)}s."
+
+
+def throttled(name: str):
+    """App command check applying the `name` throttle rule"""
+    async def predicate(interaction: discord.Interaction) -> bool:
+        retry_after = check_throttle(name, interaction)
+        if retry_after is not None:
+            raise Throttled(name, retry_after)
+        return True
+
+    return app_commands.check(predicate)
+
+
+async def allow_interaction(name: str, interaction: discord.Interaction) -> bool:
+    """Throttle check for view buttons, replies immediately when throttled"""
+    retry_after = check_throttle(name, interaction)
+    if retry_after is None:
+        return True
+    await interaction.response.send_message(throttle_message(retry_after), ephemeral=True)
+    return False
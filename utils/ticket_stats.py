@@ -0,0 +1,307 @@
+"""
+Streaming ticket SLA aggregates (first response, close time, open backlog)
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from utils.storage import load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+# How many hourly backlog samples to keep (one week)
+BACKLOG_HOURS = 168
+# How many closed ticket channels to remember so late messages don't re-open them
+RECENTLY_CLOSED_LIMIT = 1000
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded memory and relative error"""
+
+    def __init__(self, relative_accuracy: float = 0.02, max_buckets: int = 512):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        """Add a single observation (seconds)"""
+        self.count += 1
+        self.total += value
+        if value <= 1e-3:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse_lowest()
+
+    def _collapse_lowest(self):
+        """Merge the two lowest buckets so memory stays bounded"""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-th quantile (0..1), or None if empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(relative_accuracy=data.get("relative_accuracy", 0.02))
+        sketch.buckets = {int(k): v for k, v in data.get("buckets", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.total = data.get("total", 0.0)
+        return sketch
+
+
+class GuildTicketStats:
+    """Ticket SLA aggregates of a single guild"""
+
+    def __init__(self):
+        self.open_tickets: Dict[str, Dict[str, Any]] = {}
+        self.first_response = QuantileSketch()
+        self.time_to_close = QuantileSketch()
+        self.closed_total = 0
+        self.unanswered_closed = 0
+        self.backlog: Dict[int, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable copy, safe to write from another thread while this one changes"""
+        return {
+            "open_tickets": {channel_id: dict(ticket) for channel_id, ticket in self.open_tickets.items()},
+            "first_response": self.first_response.to_dict(),
+            "time_to_close": self.time_to_close.to_dict(),
+            "closed_total": self.closed_total,
+            "unanswered_closed": self.unanswered_closed,
+            "backlog": {str(k): v for k, v in self.backlog.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GuildTicketStats":
+        stats = cls()
+        stats.open_tickets = data.get("open_tickets", {})
+        stats.first_response = QuantileSketch.from_dict(data.get("first_response", {}))
+        stats.time_to_close = QuantileSketch.from_dict(data.get("time_to_close", {}))
+        stats.closed_total = data.get("closed_total", 0)
+        stats.unanswered_closed = data.get("unanswered_closed", 0)
+        stats.backlog = {int(k): v for k, v in data.get("backlog", {}).items()}
+        return stats
+
+    def sample_backlog(self, now: float):
+        """Record the open ticket count for the current hour (peak per hour)"""
+        hour = int(now // 3600)
+        self.backlog[hour] = max(self.backlog.get(hour, 0), len(self.open_tickets))
+        if len(self.backlog) > BACKLOG_HOURS:
+            for old_hour in sorted(self.backlog)[:-BACKLOG_HOURS]:
+                del self.backlog[old_hour]
+
+    def backlog_series(self, hours: int = 24, now: Optional[float] = None) -> List[int]:
+        """Peak open backlog per hour for the last `hours` hours (oldest first)"""
+        current_hour = int((now or time.time()) // 3600)
+        series = []
+        last_known = 0
+        # Carry the last known value forward across hours with no events
+        earlier = [h for h in self.backlog if h <= current_hour - hours]
+        if earlier:
+            last_known = self.backlog[max(earlier)]
+        for hour in range(current_hour - hours + 1, current_hour + 1):
+            if hour in self.backlog:
+                last_known = self.backlog[hour]
+                series.append(last_known)
+            else:
+                series.append(len(self.open_tickets) if hour == current_hour else last_known)
+        return series
+
+    def summary(self) -> Dict[str, Any]:
+        """Precomputed summary for display"""
+        return {
+            "open": len(self.open_tickets),
+            "awaiting_response": sum(1 for t in self.open_tickets.values() if t["first_response_at"] is None),
+            "closed_total": self.closed_total,
+            "unanswered_closed": self.unanswered_closed,
+            "first_response": {q: self.first_response.quantile(q) for q in (0.5, 0.9, 0.99)},
+            "time_to_close": {q: self.time_to_close.quantile(q) for q in (0.5, 0.9, 0.99)},
+            "responses_measured": self.first_response.count
+        }
+
+
+class TicketStats:
+    """Incrementally maintained ticket SLA aggregates, per guild
+
+    Only open tickets are tracked individually (creation time and first staff
+    response); closed tickets are folded into the guild's quantile sketches.
+    Changes only mark the stats dirty; the owner persists them with
+    `snapshot()`/`write()` on a timer and `save()` at shutdown.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.guilds: Dict[str, GuildTicketStats] = {}
+        self.ticket_guilds: Dict[str, str] = {}  # Open ticket channel ID -> guild ID
+        self.recently_closed: "OrderedDict[str, None]" = OrderedDict()
+        self.legacy: Optional[Dict[str, Any]] = None  # Aggregates from the old global format
+        self.dirty = False
+        self.write_lock = threading.Lock()  # The timer and shutdown flush may write at once
+        self.load()
+
+    def load(self):
+        """Load aggregates from disk"""
+        data = load_json(self.path)
+        if data and "guilds" not in data:
+            # Saved before stats were kept per guild; open tickets are picked up again lazily
+            data = {"legacy": data}
+        self.legacy = data.get("legacy")
+        self.guilds = {
+            guild_id: GuildTicketStats.from_dict(guild_data)
+            for guild_id, guild_data in data.get("guilds", {}).items()
+        }
+        self.ticket_guilds = {
+            channel_id: guild_id
+            for guild_id, stats in self.guilds.items()
+            for channel_id in stats.open_tickets
+        }
+
+    def adopt_legacy(self, guild_id: Optional[int]):
+        """Attribute aggregates saved in the old global format to a guild, or drop them if None"""
+        if self.legacy is None:
+            return
+        if guild_id is None:
+            logger.warning("Dropping global ticket stats saved before per-guild stats: the bot is in several guilds")
+        else:
+            legacy = GuildTicketStats.from_dict({**self.legacy, "open_tickets": {}})
+            self.guilds[str(guild_id)] = legacy
+            self.dirty = True
+        self.legacy = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the aggregates for writing, clears the dirty flag"""
+        self.dirty = False
+        data = {"guilds": {guild_id: stats.to_dict() for guild_id, stats in self.guilds.items()}}
+        if self.legacy is not None:
+            data["legacy"] = self.legacy  # Not adopted yet, keep it for the next start
+        return data
+
+    def write(self, data: Dict[str, Any]):
+        """Write a snapshot to disk (blocking, run it off the event loop)"""
+        try:
+            with self.write_lock:
+                save_json(self.path, data, indent=None)
+        except OSError as e:
+            self.dirty = True
+            logger.error(f"Error saving ticket stats: {e}")
+
+    def save(self):
+        """Persist aggregates to disk now"""
+        self.write(self.snapshot())
+
+    def guild(self, guild_id: int) -> GuildTicketStats:
+        return self.guilds.setdefault(str(guild_id), GuildTicketStats())
+
+    def ticket_opened(self, guild_id: int, channel_id: int, user_id: int, created_at: Optional[float] = None):
+        """Start tracking a newly opened ticket"""
+        now = created_at or time.time()
+        stats = self.guild(guild_id)
+        stats.open_tickets[str(channel_id)] = {
+            "user_id": user_id,
+            "created_at": now,
+            "first_response_at": None
+        }
+        self.ticket_guilds[str(channel_id)] = str(guild_id)
+        stats.sample_backlog(now)
+        self.dirty = True
+
+    def record_message(self, channel_id: int, is_staff: bool, sent_at: Optional[float] = None) -> bool:
+        """Record a message in a ticket channel, returns True if it was the first staff response"""
+        guild_id = self.ticket_guilds.get(str(channel_id))
+        if guild_id is None or not is_staff:
+            return False
+        stats = self.guilds[guild_id]
+        ticket = stats.open_tickets[str(channel_id)]
+        if ticket["first_response_at"] is not None:
+            return False
+        now = sent_at or time.time()
+        ticket["first_response_at"] = now
+        stats.first_response.add(max(0.0, now - ticket["created_at"]))
+        self.dirty = True
+        return True
+
+    def ticket_closed(self, channel_id: int, closed_at: Optional[float] = None):
+        """Fold a closed ticket into its guild's aggregates"""
+        self.mark_closed(channel_id)
+        guild_id = self.ticket_guilds.pop(str(channel_id), None)
+        if guild_id is None:
+            return
+        stats = self.guilds[guild_id]
+        ticket = stats.open_tickets.pop(str(channel_id))
+        now = closed_at or time.time()
+        stats.time_to_close.add(max(0.0, now - ticket["created_at"]))
+        stats.closed_total += 1
+        if ticket["first_response_at"] is None:
+            stats.unanswered_closed += 1
+        stats.sample_backlog(now)
+        self.dirty = True
+
+    def is_tracked(self, channel_id: int) -> bool:
+        return str(channel_id) in self.ticket_guilds
+
+    def mark_closed(self, channel_id: int):
+        """Remember a closed ticket channel (it may still get messages before deletion)"""
+        self.recently_closed[str(channel_id)] = None
+        self.recently_closed.move_to_end(str(channel_id))
+        while len(self.recently_closed) > RECENTLY_CLOSED_LIMIT:
+            self.recently_closed.popitem(last=False)
+
+    def was_closed(self, channel_id: int) -> bool:
+        return str(channel_id) in self.recently_closed
+
+    def backlog_series(self, guild_id: int, hours: int = 24, now: Optional[float] = None) -> List[int]:
+        """Peak open backlog per hour for a guild's last `hours` hours (oldest first)"""
+        return self.guilds.get(str(guild_id), GuildTicketStats()).backlog_series(hours, now)
+
+    def summary(self, guild_id: int) -> Dict[str, Any]:
+        """Precomputed summary of a guild's tickets for display"""
+        return self.guilds.get(str(guild_id), GuildTicketStats()).summary()
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format a duration in seconds as a short human string"""
+    if seconds is None:
+        return "n/a"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    if seconds < 86400:
+        return f"{seconds // 3600}h {(seconds % 3600) // 60}m"
+    return f"{seconds // 86400}d {(seconds % 86400) // 3600}h"
@@ -0,0 +1,128 @@
+"""
+Lightweight per-interaction tracing spans
+"""
+import collections
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """A tree of timed spans grouped under one interaction ID"""
+
+    def __init__(self, name: str, trace_id: Any, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = str(trace_id)
+        self.attributes = attributes
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.spans: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "error": self.error,
+            "attributes": self.attributes,
+            "spans": self.spans
+        }
+
+
+class Tracer:
+    """Collects finished traces in a ring buffer and optionally a JSONL file"""
+
+    def __init__(self, buffer_size: int = 200, export_path: Optional[str] = None, max_spans: int = 200):
+        self.traces = collections.deque(maxlen=buffer_size)
+        self.export_path = export_path
+        self.max_spans = max_spans
+
+    def configure(self, buffer_size: Optional[int] = None, export_path: Optional[str] = None):
+        if buffer_size is not None:
+            self.traces = collections.deque(self.traces, maxlen=buffer_size)
+        self.export_path = export_path or None
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Any, **attributes):
+        """Start a root trace for an interaction; nested calls join the outer trace"""
+        if _current_trace.get() is not None:
+            with self.span(name, **attributes):
+                yield
+            return
+
+        trace = Trace(name, trace_id, attributes)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.error = type(e).__name__
+            raise
+        finally:
+            trace.duration = time.perf_counter() - trace._start
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block inside the current trace (no-op when there is none)"""
+        trace = _current_trace.get()
+        if trace is None or len(trace.spans) >= self.max_spans:
+            yield
+            return
+
+        span_id = len(trace.spans)
+        record = {
+            "id": span_id,
+            "parent": _current_span.get(),
+            "name": name,
+            "start_ms": round((time.perf_counter() - trace._start) * 1000, 2),
+            "duration_ms": None,
+            "attributes": attributes
+        }
+        trace.spans.append(record)
+        token = _current_span.set(span_id)
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            _current_span.reset(token)
+
+    def _finish(self, trace: Trace):
+        self.traces.append(trace)
+        if not self.export_path:
+            return
+        try:
+            with open(self.export_path, 'a') as f:
+                f.write(json.dumps(trace.to_dict()) + "\n")
+        except OSError as e:
+            logger.error(f"Error exporting trace: {e}")
+
+    def slowest(self, limit: int = 5, name: Optional[str] = None) -> List[Trace]:
+        """Slowest recent traces, optionally filtered by root name"""
+        candidates = [t for t in self.traces if name is None or t.name == name]
+        return sorted(candidates, key=lambda t: t.duration or 0, reverse=True)[:limit]
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """Shortcut for `tracer.span`"""
+    return tracer.span(name, **attributes)